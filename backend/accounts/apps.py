@@ -5,4 +5,9 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
     
     def ready(self):
+        from django.contrib.auth.models import update_last_login
+        from django.contrib.auth.signals import user_logged_in
+        
+        # accounts.signals records last_login without a full user save
+        user_logged_in.disconnect(update_last_login, dispatch_uid='update_last_login')
         import accounts.signals  # noqa
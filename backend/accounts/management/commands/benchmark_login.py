@@ -0,0 +1,96 @@
+"""
+Benchmark the token login path (``CustomTokenObtainPairSerializer``).
+
+Each login authenticates, issues a refresh/access pair, records last_login
+and serializes the user with ``UserSerializer``, exactly as the token view
+does. The stock ``TokenObtainPairSerializer`` is measured alongside for
+comparison. Synthetic users are created inside a transaction that is rolled
+back, so the command is safe to run against a development database.
+
+Password hashing dominates a real login; ``--fast-hasher`` swaps in the MD5
+hasher to expose the cost of everything else.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from accounts.models import Profile
+from accounts.serializers import CustomTokenObtainPairSerializer, UserSerializer
+
+User = get_user_model()
+
+PASSWORD = 'Bench-login-1'
+
+
+class Rollback(Exception):
+    """Raised inside transaction.atomic() to discard synthetic users"""
+
+
+class Command(BaseCommand):
+    help = 'Measure statements and throughput of the token login path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Hash with MD5 so the numbers exclude password hashing'
+        )
+
+    def handle(self, *args, **options):
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            try:
+                with transaction.atomic():
+                    emails = self._create_users(options['users'])
+                    self.stdout.write(
+                        f"{'serializer':<34} {'statements':>10} {'ms/login':>10} {'logins/s':>10}"
+                    )
+                    for serializer_class in (TokenObtainPairSerializer, CustomTokenObtainPairSerializer):
+                        self._measure(serializer_class, emails, options['logins'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _create_users(self, count):
+        # Hash once: every synthetic user shares the same password
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(email=f'bench-login-{number}@example.com', password=password,
+                 first_name='Bench', last_name=f'User {number}', user_type='STUDENT')
+            for number in range(count)
+        ])
+        Profile.objects.bulk_create([Profile(user=user) for user in users])
+        return [user.email for user in users]
+
+    def _login(self, serializer_class, email):
+        serializer = serializer_class(data={'email': email, 'password': PASSWORD})
+        serializer.is_valid(raise_exception=True)
+        if 'user' not in serializer.validated_data:
+            # The stock view returns the tokens only; serialize the user as
+            # the custom serializer does so both rows do the same work
+            UserSerializer(serializer.user).data
+        return serializer.validated_data
+
+    def _measure(self, serializer_class, emails, logins):
+        with CaptureQueriesContext(connection) as context:
+            self._login(serializer_class, emails[0])
+        statements = len([
+            query for query in context.captured_queries
+            if not query['sql'].upper().startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ])
+
+        started = time.perf_counter()
+        for number in range(logins):
+            self._login(serializer_class, emails[number % len(emails)])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{serializer_class.__name__:<34} {statements:>10} '
+            f'{elapsed / logins * 1000:>10.2f} {logins / elapsed:>10.1f}'
+        )
@@ -0,0 +1,224 @@
+"""
+Mixed-workload benchmark: student list/detail latency during a login burst,
+against gunicorn started the way the Dockerfile starts it.
+
+``gunicorn core.wsgi`` runs from this checkout, so it reads
+``gunicorn.conf.py`` (sync workers; one unless ``--workers`` or
+``WEB_CONCURRENCY`` says otherwise) and uses the same settings and database. Throttling
+is switched off (``DISABLE_THROTTLING``) so logins are not answered with
+429s. Reader connections cycle through the student list and detail
+endpoints with a bearer token. At the same time, login connections POST
+credentials to the token endpoint as fast as they can. That is real PBKDF2
+hashing, and after a 503 a login waits for ``Retry-After``. Three phases are
+measured:
+
+* readers only
+* readers during a burst with the configured hashing limit (``core.hashing``)
+* readers during a burst without it, on a second server whose limit is
+  raised to the number of login connections
+
+In the second phase reader latency should stay close to the first phase,
+with logins beyond the limit answered with 503s; that is what the limit is
+for. In the third phase every worker can be busy hashing. The hashing slots
+are shared through Redis, so the ``default`` cache must be Redis for the
+limit to span the worker processes. Pass ``--url`` to measure a deployment
+started elsewhere (same database, throttling off); only the first two phases
+run then.
+
+The load generator is the asyncio client from ``benchmark_wsgi_asgi``.
+Servers need committed rows, so the synthetic students and users are deleted
+afterwards rather than rolled back.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.tokens import RefreshToken
+from core import hashing
+from core.management.commands.benchmark_wsgi_asgi import Connection, fetch_once
+from students import counters, result_cache
+from students.management.commands._synthetic import build_students
+from students.models import Student
+
+User = get_user_model()
+
+PASSWORD = 'Bench-burst-1'
+EMAIL_PREFIX = 'bench-burst-'
+TOKEN_PATH = '/api/auth/token/'
+
+
+class Command(BaseCommand):
+    help = 'Measure student list/detail latency under gunicorn while logins hash passwords concurrently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--readers', type=int, default=4, help='Reader connections')
+        parser.add_argument('--logins', type=int, default=16, help='Login connections')
+        parser.add_argument('--seconds', type=float, default=10.0, help='Measured duration of each phase')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured load before each phase')
+        parser.add_argument('--workers', type=int, help='gunicorn workers (default: WEB_CONCURRENCY or 1)')
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8103)
+        parser.add_argument('--url', help='Measure this running deployment instead of starting gunicorn')
+
+    def handle(self, *args, **options):
+        if isinstance(hashing.get_slots()[0], hashing.LocalSlots):
+            self.stderr.write('The default cache is not Redis: each worker process gets its own hashing limit')
+        students = list(build_students(options['students'], prefix='BURST-', seed=3))
+        try:
+            Student.objects.bulk_create(students, batch_size=2000)
+            counters.record_created(students)
+            result_cache.invalidate()
+            reader = User.objects.create_user(email=f'{EMAIL_PREFIX}reader@example.com', is_staff=True)
+            password = make_password(PASSWORD)
+            User.objects.bulk_create([
+                User(email=f'{EMAIL_PREFIX}{number}@example.com', password=password)
+                for number in range(options['logins'])
+            ])
+            token = str(RefreshToken.for_user(reader).access_token)
+            paths = []
+            for student in students[:50]:
+                paths += ['/api/students/', f'/api/students/{student.pk}/']
+
+            self.stdout.write(
+                f"{'phase':<20} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+                f"{'logins':>7} {'p50 ms':>8} {'503s':>6}"
+            )
+            if options['url']:
+                self._phase('readers only', options['url'], paths, token, 0, options)
+                self._phase('burst, limited', options['url'], paths, token, options['logins'], options)
+                return
+            with self._server(options) as base_url:
+                self._phase('readers only', base_url, paths, token, 0, options)
+                self._phase('burst, limited', base_url, paths, token, options['logins'], options)
+            with self._server(options, PASSWORD_HASHING_CONCURRENCY=str(options['logins'])) as base_url:
+                self._phase('burst, unlimited', base_url, paths, token, options['logins'], options)
+        finally:
+            Student.objects.filter(pk__in=[student.pk for student in students]).delete()
+            User.objects.filter(email__startswith=EMAIL_PREFIX).delete()
+
+    @contextmanager
+    def _server(self, options, **environ):
+        """gunicorn as in the Dockerfile, on ``--port``; yields its base URL"""
+        command = [
+            sys.executable, '-m', 'gunicorn', '--bind', f"{options['host']}:{options['port']}", 'core.wsgi',
+            '--log-level', 'warning',
+        ]
+        if options['workers']:
+            command += ['--workers', str(options['workers'])]
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'),
+            'DJANGO_ASGI': '0',
+            'DISABLE_THROTTLING': '1',
+            **environ,
+        }
+        try:
+            server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        except OSError as e:
+            raise CommandError(f'Could not start gunicorn: {e}')
+        base_url = f"http://{options['host']}:{options['port']}"
+        try:
+            self._wait_until_ready(server, base_url)
+            yield base_url
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    def _wait_until_ready(self, server, base_url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                status, _ = asyncio.run(fetch_once(base_url, '/livez', None))
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f'gunicorn did not answer /livez within {timeout}s')
+
+    def _phase(self, label, base_url, paths, token, logins, options):
+        bodies = [
+            orjson.dumps({'email': f'{EMAIL_PREFIX}{number}@example.com', 'password': PASSWORD})
+            for number in range(logins)
+        ]
+        result = asyncio.run(run_burst(
+            base_url, paths, token, bodies, options['readers'], options['warmup'], options['seconds']
+        ))
+        reads, logins_ok = sorted(result['reads']), sorted(result['logins'])
+        self.stdout.write(
+            f"{label:<20} {len(reads):>7} {percentile(reads, 0.5):>8.1f} {percentile(reads, 0.99):>8.1f} "
+            f"{result['errors']:>7} {len(logins_ok):>7} {percentile(logins_ok, 0.5):>8.1f} "
+            f"{result['rejected']:>6}"
+        )
+
+
+def percentile(latencies, fraction):
+    """``fraction`` percentile of sorted ``latencies`` in milliseconds"""
+    if not latencies:
+        return 0
+    return latencies[max(0, int(len(latencies) * fraction) - 1)] * 1000
+
+
+async def run_burst(base_url, paths, token, login_bodies, readers, warmup, seconds):
+    """Readers and logins for ``warmup + seconds``; the measured part is returned"""
+    result = {'reads': [], 'errors': 0, 'logins': [], 'rejected': 0}
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + seconds
+
+    async def send(connection, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, headers, _ = await connection.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            connection.close()
+            status, headers = None, {}
+        return status, headers, started, time.perf_counter()
+
+    async def reader(number):
+        connection = Connection(base_url, token)
+        index = number
+        while time.perf_counter() < stop_at:
+            status, _, started, finished = await send(connection, 'GET', paths[index % len(paths)])
+            if started >= measure_from:
+                if status == 200:
+                    result['reads'].append(finished - started)
+                else:
+                    result['errors'] += 1
+            index += 1
+        connection.close()
+
+    async def login(body):
+        connection = Connection(base_url)
+        while time.perf_counter() < stop_at:
+            status, headers, started, finished = await send(connection, 'POST', TOKEN_PATH, body)
+            if started >= measure_from:
+                if status == 200:
+                    result['logins'].append(finished - started)
+                elif status == 503:
+                    result['rejected'] += 1
+                else:
+                    result['errors'] += 1
+            if status == 503:
+                await asyncio.sleep(float(headers.get('retry-after', 1)))
+        connection.close()
+
+    await asyncio.gather(
+        *(reader(number) for number in range(readers)),
+        *(login(body) for body in login_bodies),
+    )
+    return result
@@ -0,0 +1,114 @@
+"""
+Benchmark refresh-token rotation as the number of revoked tokens grows.
+
+For each size, that many revoked tokens are added to both blacklists:
+rows in simplejwt's ``OutstandingToken``/``BlacklistedToken`` tables and
+keys in the ``token_blacklist`` cache of ``accounts.tokens``. A chain of
+refreshes is then timed through simplejwt's stock ``TokenRefreshSerializer``
+and through ``accounts.serializers.TokenRefreshSerializer``.
+
+Database rows are inserted inside a transaction that is rolled back, and the
+synthetic cache keys are deleted afterwards.
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as StockTokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as StockRefreshToken
+
+from accounts.serializers import TokenRefreshSerializer
+from accounts.tokens import BLACKLIST_KEY, RefreshToken, get_blacklist_cache
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    """Raised inside transaction.atomic() to discard synthetic rows"""
+
+
+class Command(BaseCommand):
+    help = 'Measure refresh latency of the database and cache blacklists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+            help='Numbers of revoked tokens to measure (synthetic tokens added per step)'
+        )
+        parser.add_argument('--refreshes', type=int, default=200)
+
+    def handle(self, *args, **options):
+        keys = []
+        self.stdout.write(
+            f"{'revoked':>10} {'blacklist':<10} {'statements':>10} {'ms/refresh':>11}"
+        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(email='bench-refresh@example.com')
+                inserted = 0
+                for size in sorted(options['sizes']):
+                    keys.extend(self._revoke(user, size - inserted))
+                    inserted = size
+                    self._measure(
+                        size, 'database', StockTokenRefreshSerializer,
+                        StockRefreshToken.for_user(user), options['refreshes']
+                    )
+                    self._measure(
+                        size, 'cache', TokenRefreshSerializer,
+                        RefreshToken.for_user(user), options['refreshes']
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            for start in range(0, len(keys), BATCH_SIZE):
+                get_blacklist_cache().delete_many(keys[start:start + BATCH_SIZE])
+
+    def _revoke(self, user, count):
+        """Add ``count`` revoked tokens to both blacklists, return the cache keys"""
+        now = timezone.now()
+        expires_at = now + timedelta(days=1)
+        keys = []
+        for start in range(0, count, BATCH_SIZE):
+            jtis = [uuid.uuid4().hex for _ in range(min(BATCH_SIZE, count - start))]
+            outstanding = OutstandingToken.objects.bulk_create([
+                OutstandingToken(user=user, jti=jti, token=jti, created_at=now, expires_at=expires_at)
+                for jti in jtis
+            ])
+            BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in outstanding])
+
+            batch = {BLACKLIST_KEY.format(jti=jti): 1 for jti in jtis}
+            get_blacklist_cache().set_many(batch, int(timedelta(days=1).total_seconds()))
+            keys.extend(batch)
+        return keys
+
+    def _refresh(self, serializer_class, token):
+        serializer = serializer_class(data={'refresh': token})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['refresh']
+
+    def _measure(self, size, label, serializer_class, refresh, refreshes):
+        token = str(refresh)
+        with CaptureQueriesContext(connection) as context:
+            token = self._refresh(serializer_class, token)
+        statements = len([
+            query for query in context.captured_queries
+            if not query['sql'].upper().startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ])
+
+        started = time.perf_counter()
+        for _ in range(refreshes):
+            token = self._refresh(serializer_class, token)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{size:>10} {label:<10} {statements:>10} {elapsed / refreshes * 1000:>11.2f}'
+        )
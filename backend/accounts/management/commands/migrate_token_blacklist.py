@@ -0,0 +1,54 @@
+"""
+Copy revoked refresh tokens from simplejwt's ``token_blacklist`` tables into
+the cache-backed blacklist (``accounts.tokens``).
+
+Only tokens that have not expired yet are copied; each cache entry expires
+with its token. Run it once when deploying the cache-backed blacklist (new
+refreshes no longer write to the tables). ``--flush`` then empties the
+tables. Once they are empty, ``manage.py migrate token_blacklist zero``
+drops them, and the app can be removed from INSTALLED_APPS.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from accounts.tokens import blacklist_jti
+
+
+class Command(BaseCommand):
+    help = 'Copy unexpired blacklisted refresh tokens from the database into the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Count the tokens that would be copied without writing anything'
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Delete every OutstandingToken/BlacklistedToken row after copying'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        revoked = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=timezone.now())
+            .values_list('token__jti', 'token__expires_at')
+        )
+        copied = 0
+        for jti, expires_at in revoked.iterator(chunk_size=options['batch_size']):
+            if not options['dry_run']:
+                blacklist_jti(jti, expires_at.timestamp())
+            copied += 1
+
+        verb = 'Would copy' if options['dry_run'] else 'Copied'
+        self.stdout.write(f'{verb} {copied} unexpired blacklisted tokens to the cache')
+
+        if options['flush'] and not options['dry_run']:
+            # Blacklist rows first, so neither delete has rows to cascade to
+            blacklisted, _ = BlacklistedToken.objects.all().delete()
+            outstanding, _ = OutstandingToken.objects.all().delete()
+            self.stdout.write(
+                f'Deleted {blacklisted} blacklisted and {outstanding} outstanding token rows'
+            )
+        self.stdout.write(self.style.SUCCESS('Done'))
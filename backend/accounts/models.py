@@ -1,7 +1,13 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from core.tracking import DirtyFieldsMixin
+
+from . import user_cache
+
 class UserManager(BaseUserManager):
     """Custom user model manager where email is the unique identifier"""
     def create_user(self, email, password=None, **extra_fields):
@@ -26,7 +32,7 @@ class UserManager(BaseUserManager):
             raise ValueError(_('Superuser must have is_superuser=True.'))
         return self.create_user(email, password, **extra_fields)
 
-class User(AbstractUser, PermissionsMixin):
+class User(DirtyFieldsMixin, AbstractUser, PermissionsMixin):
     """Custom user model that uses email as the unique identifier"""
     USER_TYPE_CHOICES = (
         ('ADMIN', 'Admin'),
@@ -49,6 +55,12 @@ class User(AbstractUser, PermissionsMixin):
     
     objects = UserManager()
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive email lookups (see students.importer)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
+    
     def __str__(self):
         return self.email
     
@@ -56,8 +68,18 @@ class User(AbstractUser, PermissionsMixin):
     def full_name(self):
         """Return the full name of the user."""
         return f"{self.first_name} {self.last_name}".strip()
+    
+    def record_login(self):
+        """
+        Set last_login with a single UPDATE. No save signals are sent, so
+        logging in does not touch the profile.
+        """
+        self.last_login = timezone.now()
+        type(self)._default_manager.filter(pk=self.pk).update(last_login=self.last_login)
+        self._snapshot_fields({'last_login'})
+        user_cache.bump_on_commit(self.pk)
 
-class Profile(models.Model):
+class Profile(DirtyFieldsMixin, models.Model):
     """Extended user profile information"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.TextField(blank=True, null=True)
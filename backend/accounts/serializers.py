@@ -1,12 +1,19 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenObtainSerializer, TokenRefreshSerializer as BaseTokenRefreshSerializer
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from core.serializers import TimedSerializerMixin
+
 from .models import Profile, EmailVerificationToken
+from .tokens import RefreshToken
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object"""
     class Meta:
         model = User
@@ -14,7 +21,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'is_active', 'is_verified', 'date_joined', 'last_login')
         read_only_fields = ('id', 'is_active', 'is_verified', 'date_joined', 'last_login')
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating a new user"""
     password = serializers.CharField(
         write_only=True,
@@ -48,7 +55,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(**validated_data)
         return user
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for updating user information"""
     class Meta:
         model = User
@@ -76,7 +83,7 @@ class ResetPasswordSerializer(serializers.Serializer):
     token = serializers.CharField(required=True)
     uidb64 = serializers.CharField(required=True)
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for user profile"""
     user = UserSerializer(read_only=True)
     
@@ -86,12 +93,23 @@ class ProfileSerializer(serializers.ModelSerializer):
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom token serializer to include additional user data in the response"""
+    token_class = RefreshToken
+    
     def validate(self, attrs):
-        data = super().validate(attrs)
+        # Authenticate only: TokenObtainPairSerializer.validate would issue a
+        # second refresh token and record last_login with a full user save
+        data = TokenObtainSerializer.validate(self, attrs)
         refresh = self.get_token(self.user)
         data['refresh'] = str(refresh)
         data['access'] = str(refresh.access_token)
         
+        if api_settings.UPDATE_LAST_LOGIN:
+            self.user.record_login()
+        
         # Add extra responses here
         data['user'] = UserSerializer(self.user).data
         return data
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh (and rotate) tokens against the cache-backed blacklist"""
+    token_class = RefreshToken
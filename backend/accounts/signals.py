@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from .models import Profile
+from . import user_cache
 
 User = get_user_model()
 
@@ -9,12 +11,30 @@ User = get_user_model()
 def create_user_profile(sender, instance, created, **kwargs):
     """Create a profile for new users"""
     if created:
-        Profile.objects.get_or_create(user=instance)
+        # A brand new user cannot have a profile yet, so skip the lookup
+        Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save the user profile when the user is saved"""
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        Profile.objects.get_or_create(user=instance)
+def save_user_profile(sender, instance, created, **kwargs):
+    """Save the user's loaded profile along with the user if it was changed"""
+    if created or not User.profile.related.is_cached(instance):
+        return
+    profile = User.profile.related.get_cached_value(instance)
+    if profile is None:
+        return
+    changed = profile.get_dirty_fields()
+    if changed:
+        profile.save(update_fields=changed)
+
+
+@receiver(user_logged_in)
+def record_last_login(sender, user, **kwargs):
+    """Replaces django.contrib.auth's update_last_login, which saves the whole user"""
+    user.record_login()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Stop token authentication from using cached copies of the user"""
+    user_cache.bump_on_commit(instance.pk)
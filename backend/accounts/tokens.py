@@ -0,0 +1,87 @@
+"""
+Refresh tokens with a blacklist kept in Redis.
+
+simplejwt's ``token_blacklist`` app records every issued refresh token in
+``OutstandingToken`` and every rotated one in ``BlacklistedToken``; both
+tables grow without bound and every refresh queries them. ``RefreshToken``
+here stores only revoked JTIs, in the ``token_blacklist`` cache, each
+expiring when the token itself would have expired. Nothing is recorded for
+issued tokens.
+
+A revoked JTI is the only record that the token is revoked, so losing one
+makes a rotated or stolen refresh token valid again. The ``token_blacklist``
+cache is therefore its own Redis, configured not to evict keys
+(``noeviction`` in docker-compose.yml), not the shared LRU cache, and it
+does not ignore errors. When Redis cannot be reached, refresh tokens are
+rejected: neither the blacklist check nor a rotation can succeed, so clients
+have to log in again once it is back (access tokens are unaffected).
+
+Existing ``BlacklistedToken`` rows are copied over by the
+``migrate_token_blacklist`` management command.
+"""
+import logging
+import math
+import time
+
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, Token
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_CACHE = 'token_blacklist'
+BLACKLIST_KEY = 'accounts:token:blacklist:{jti}'
+
+
+def get_blacklist_cache():
+    return caches[BLACKLIST_CACHE]
+
+
+def blacklist_jti(jti, expires_at):
+    """Blacklist ``jti`` until ``expires_at`` (a unix timestamp)"""
+    timeout = math.ceil(expires_at - time.time())
+    if timeout > 0:
+        get_blacklist_cache().set(BLACKLIST_KEY.format(jti=jti), 1, timeout)
+
+
+def is_blacklisted(jti):
+    return get_blacklist_cache().get(BLACKLIST_KEY.format(jti=jti)) is not None
+
+
+class RefreshToken(Token):
+    """simplejwt's ``RefreshToken`` without the database-backed blacklist"""
+    token_type = 'refresh'
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME
+    no_copy_claims = BaseRefreshToken.no_copy_claims
+    access_token_class = AccessToken
+    access_token = BaseRefreshToken.access_token
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        try:
+            blacklisted = is_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        except RedisError:
+            # Fail closed: an unchecked token may have been revoked
+            logger.error('Token blacklist unavailable, rejecting refresh token', exc_info=True)
+            raise TokenError(_("Token revocation cannot be checked"))
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        try:
+            blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        except RedisError:
+            # Without the record the token would stay usable, so it is not rotated
+            logger.error('Token blacklist unavailable, could not revoke refresh token', exc_info=True)
+            raise TokenError(_("Token cannot be revoked"))
+
+    def outstand(self):
+        """Issued tokens are not tracked, see the module docstring"""
+        return None
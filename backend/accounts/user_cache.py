@@ -0,0 +1,169 @@
+"""
+Cached user lookups for token authentication.
+
+Users are cached in the ``default`` cache and in a small per-process LRU,
+both keyed on the user id and a per-user version counter kept in the shared
+cache. The counter is bumped (after the transaction commits) whenever the
+user is saved or deleted, including the queryset updates that bypass save
+signals, so every process stops using an old copy on its next lookup.
+
+Only the version is read from the shared cache on a local hit. When the
+shared cache is unavailable, users are loaded from the database. The
+password hash is never cached: it is left deferred, so code that needs it
+(``check_password()``, token revocation checks) loads it on access.
+``aget_user()`` is the same lookup for async views.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'accounts:user:{pk}:version'
+ENTRY_KEY = 'accounts:user:{pk}:{version}'
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_LOCAL_SIZE = 1024
+
+
+def get_timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def new_version():
+    """
+    Seed for a missing counter. Time based, so a counter that was evicted
+    never restarts at a value that old entries were stored under.
+    """
+    return time.time_ns() // 1000
+
+
+def get_version(pk):
+    key = VERSION_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(pk):
+    key = VERSION_KEY.format(pk=pk)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, new_version(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump(pk):
+    """Invalidate every cached copy of user ``pk``"""
+    key = VERSION_KEY.format(pk=pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), None)
+
+
+def bump_on_commit(*pks):
+    """
+    Bump once the current transaction commits. Bumping earlier would let a
+    concurrent lookup cache the uncommitted-away row under the new version.
+    """
+    def apply():
+        for pk in pks:
+            bump(pk)
+    transaction.on_commit(apply)
+
+
+class LocalUserCache:
+    """Thread-safe LRU of ``pk -> (version, expires, user)``"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, pk, version):
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is None:
+                return None
+            entry_version, expires, user = entry
+            if entry_version != version or expires < time.monotonic():
+                del self._entries[pk]
+                return None
+            self._entries.move_to_end(pk)
+            return user
+
+    def set(self, pk, version, user, timeout):
+        with self._lock:
+            self._entries[pk] = (version, time.monotonic() + timeout, user)
+            self._entries.move_to_end(pk)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def without_password(user):
+    """Copy of ``user`` with the password hash deferred"""
+    user = copy.copy(user)
+    user.__dict__.pop('password', None)
+    loaded = getattr(user, '_loaded_values', None)
+    if loaded is not None:
+        user._loaded_values = {name: value for name, value in loaded.items() if name != 'password'}
+    return user
+
+
+local = LocalUserCache(getattr(settings, 'USER_CACHE_LOCAL_SIZE', DEFAULT_LOCAL_SIZE))
+
+
+def get_user(pk):
+    """
+    Return a private copy of the user with primary key ``pk``. Raises the
+    user model's ``DoesNotExist`` like ``objects.get()``.
+    """
+    User = get_user_model()
+    pk = str(pk)
+    timeout = get_timeout()
+    version = get_version(pk) if timeout else None
+    if version is None:
+        return User._default_manager.get(pk=pk)
+
+    user = local.get(pk, version)
+    if user is None:
+        key = ENTRY_KEY.format(pk=pk, version=version)
+        user = cache.get(key)
+        if user is None:
+            user = without_password(User._default_manager.get(pk=pk))
+            cache.set(key, user, timeout)
+        local.set(pk, version, user, timeout)
+    # Views may modify request.user, so never hand out the cached instance
+    return copy.copy(user)
+
+
+async def aget_user(pk):
+    """Async version of ``get_user()``"""
+    User = get_user_model()
+    pk = str(pk)
+    timeout = get_timeout()
+    version = await aget_version(pk) if timeout else None
+    if version is None:
+        return await User._default_manager.aget(pk=pk)
+
+    user = local.get(pk, version)
+    if user is None:
+        key = ENTRY_KEY.format(pk=pk, version=version)
+        user = await cache.aget(key)
+        if user is None:
+            user = without_password(await User._default_manager.aget(pk=pk))
+            await cache.aset(key, user, timeout)
+        local.set(pk, version, user, timeout)
+    return copy.copy(user)
@@ -6,9 +6,12 @@ from django.contrib.auth import get_user_model
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings
 
+from core import hashing, outbox
+from core.throttling import LoginRateThrottle
+
 from .models import Profile, EmailVerificationToken
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
@@ -18,17 +21,27 @@ from .serializers import (
 
 User = get_user_model()
 
-class RegisterView(generics.CreateAPIView):
+class PasswordHashingLimitMixin:
+    """
+    Hash passwords within the host-wide admission limit (core.hashing); a
+    request that gets no slot is answered with a 503 and Retry-After
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with hashing.limited():
+            return super().dispatch(request, *args, **kwargs)
+
+class RegisterView(PasswordHashingLimitMixin, generics.CreateAPIView):
     """View for user registration"""
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
     permission_classes = [permissions.AllowAny]
     
+    @transaction.atomic
     def perform_create(self, serializer):
+        # The profile is created by accounts.signals.create_user_profile
         user = serializer.save()
-        # Create a profile for the user
-        Profile.objects.create(user=user)
-        # Send verification email
+        # Queue the verification email; it is only sent if the user is committed
         self.send_verification_email(user)
     
     def send_verification_email(self, user):
@@ -42,7 +55,7 @@ class RegisterView(generics.CreateAPIView):
         verification_url = f"{settings.FRONTEND_URL}/verify-email/{user.id}/{token}/"
         subject = 'Verify your email address'
         message = f'Please click the following link to verify your email: {verification_url}'
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+        outbox.enqueue(subject, message, [user.email], settings.DEFAULT_FROM_EMAIL)
 
 class VerifyEmailView(APIView):
     """View for email verification"""
@@ -60,11 +73,12 @@ class VerifyEmailView(APIView):
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             return Response({'error': 'Invalid user'}, status=status.HTTP_400_BAD_REQUEST)
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(PasswordHashingLimitMixin, TokenObtainPairView):
     """Custom token obtain view to use our custom serializer"""
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginRateThrottle]
 
-class ChangePasswordView(generics.UpdateAPIView):
+class ChangePasswordView(PasswordHashingLimitMixin, generics.UpdateAPIView):
     """View for changing password"""
     serializer_class = ChangePasswordSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -102,14 +116,14 @@ class ResetPasswordEmailView(APIView):
                 
                 subject = 'Password Reset Requested'
                 message = f'Click the following link to reset your password: {reset_url}'
-                send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+                outbox.enqueue(subject, message, [user.email], settings.DEFAULT_FROM_EMAIL)
                 
                 return Response({"message": "Password reset email sent"}, status=status.HTTP_200_OK)
             except User.DoesNotExist:
                 return Response({"error": "User with this email does not exist"}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ResetPasswordView(APIView):
+class ResetPasswordView(PasswordHashingLimitMixin, APIView):
     """View for resetting password"""
     permission_classes = [permissions.AllowAny]
     
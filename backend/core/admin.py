@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import OutboxEmail
+from .outbox import requeue
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    date_hierarchy = 'created_at'
+    actions = ['requeue_dead']
+    
+    def requeue_dead(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f"{count} dead emails queued for another round of attempts.")
+    requeue_dead.short_description = "Requeue selected dead emails"
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -6,5 +6,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Route the student read endpoints to their async views (see settings)
+os.environ.setdefault('DJANGO_ASGI', '1')
 
 application = get_asgi_application()
+
+# Build the in-memory student autocomplete index before the first request
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'STUDENT_AUTOCOMPLETE_WARM_ON_STARTUP', False):
+    from students.autocomplete import warm_in_background
+    warm_in_background()
@@ -0,0 +1,127 @@
+"""
+Native async function views for read-only REST endpoints.
+
+DRF's ``APIView`` is sync-only, so under ASGI every DRF request takes a
+thread hop and holds a worker thread while it waits on the database.
+``async_api_view`` covers what the read endpoints need from ``@api_view``
+without that: authentication (``aauthenticate()`` where the class has it,
+otherwise the sync method in a thread), permissions, throttling
+(``aallow_request()`` likewise), DRF's exception handler and rendering with
+``ORJSONRenderer``. Views receive a DRF ``Request`` and return a DRF
+``Response``, so the result cache and conditional GET helpers work unchanged.
+
+Only GET and HEAD are accepted and only JSON is rendered.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import ORJSONRenderer
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+async def authenticate(request, authenticators):
+    for authenticator in authenticators:
+        if hasattr(authenticator, 'aauthenticate'):
+            user_auth_tuple = await authenticator.aauthenticate(request)
+        else:
+            user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+        if user_auth_tuple is not None:
+            request.user, request.auth = user_auth_tuple
+            return
+    request.user = api_settings.UNAUTHENTICATED_USER()
+    request.auth = None
+
+
+def check_permissions(request, view, permissions):
+    for permission in permissions:
+        if not permission.has_permission(request, view):
+            if not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied(detail=getattr(permission, 'message', None))
+
+
+async def check_throttles(request, view, throttles):
+    waits = []
+    for throttle in throttles:
+        if hasattr(throttle, 'aallow_request'):
+            allowed = await throttle.aallow_request(request, view)
+        else:
+            allowed = await sync_to_async(throttle.allow_request)(request, view)
+        if not allowed:
+            waits.append(throttle.wait())
+    if waits:
+        waits = [wait for wait in waits if wait is not None]
+        raise exceptions.Throttled(max(waits, default=None))
+
+
+def handle_exception(exc, request, view, authenticators):
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        header = authenticators[0].authenticate_header(request) if authenticators else None
+        if header:
+            exc.auth_header = header
+        else:
+            exc.status_code = 403
+
+    response = api_settings.EXCEPTION_HANDLER(exc, {'view': view, 'request': request})
+    if response is None:
+        raise exc
+    response.exception = True
+    return response
+
+
+def finalize(response, renderer):
+    if not isinstance(response, Response):
+        # e.g. the 304 from a conditional GET
+        return response
+    response.accepted_renderer = renderer
+    response.accepted_media_type = renderer.media_type
+    response.renderer_context = {}
+    return response.render()
+
+
+def async_api_view(authentication_classes=None, permission_classes=None, throttle_classes=None):
+    """
+    Decorator turning ``async def view(request, *args, **kwargs)`` into an
+    async Django view. Unset policies default to the ``REST_FRAMEWORK``
+    settings, as with ``@api_view``.
+
+    Permission checks run on the event loop, so the classes must not query
+    the database (``IsAuthenticated`` and ``IsAdminUser`` don't).
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(http_request, *args, **kwargs):
+            renderer = ORJSONRenderer()
+            request = Request(http_request)
+            request.accepted_renderer = renderer
+            request.accepted_media_type = renderer.media_type
+            authenticators = [
+                cls() for cls in (authentication_classes or api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+            ]
+            try:
+                if http_request.method not in SAFE_METHODS:
+                    raise exceptions.MethodNotAllowed(http_request.method)
+                await authenticate(request, authenticators)
+                check_permissions(request, wrapper, [
+                    cls() for cls in (permission_classes or api_settings.DEFAULT_PERMISSION_CLASSES)
+                ])
+                await check_throttles(request, wrapper, [
+                    cls() for cls in (
+                        api_settings.DEFAULT_THROTTLE_CLASSES if throttle_classes is None else throttle_classes
+                    )
+                ])
+                response = await view(request, *args, **kwargs)
+            except (exceptions.APIException, Http404, PermissionDenied) as exc:
+                response = handle_exception(exc, request, wrapper, authenticators)
+            return finalize(response, renderer)
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+"""
+django-redis client that reports cache metrics, see ``core.metrics``.
+
+Enabled with ``CACHES['default']['OPTIONS']['CLIENT_CLASS']``. Gets are
+counted as hits or misses (per key for ``get_many``), every other operation
+as ok or error, and each operation's latency is observed. Operations that
+django-redis implements on top of another one (``add`` is a ``set``) are
+recorded once, under the outer name.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django_redis.client import DefaultClient
+
+from . import metrics
+
+MISSING = object()
+
+_recording = ContextVar('cache_metrics_recording', default=False)
+
+
+def instrumented(method):
+    operation = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _recording.get():
+            return method(self, *args, **kwargs)
+        token = _recording.set(True)
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            value = method(self, *args, **kwargs)
+            result = 'ok'
+            return value
+        finally:
+            _recording.reset(token)
+            metrics.record_cache(operation, result, time.perf_counter() - started)
+    return wrapper
+
+
+class InstrumentedRedisClient(DefaultClient):
+
+    def get(self, key, default=None, version=None, client=None):
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            value = super().get(key, default=MISSING, version=version, client=client)
+            result = 'miss' if value is MISSING else 'hit'
+        finally:
+            metrics.record_cache('get', result, time.perf_counter() - started)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        started = time.perf_counter()
+        try:
+            values = super().get_many(keys, version=version, client=client)
+        except Exception:
+            metrics.record_cache('get_many', 'error', time.perf_counter() - started)
+            raise
+        metrics.record_cache('get_many', 'hit', time.perf_counter() - started, count=len(values))
+        metrics.record_cache('get_many', 'miss', count=len(keys) - len(values))
+        return values
+
+    set = instrumented(DefaultClient.set)
+    add = instrumented(DefaultClient.add)
+    set_many = instrumented(DefaultClient.set_many)
+    delete = instrumented(DefaultClient.delete)
+    delete_many = instrumented(DefaultClient.delete_many)
+    incr = instrumented(DefaultClient.incr)
+    decr = instrumented(DefaultClient.decr)
+    has_key = instrumented(DefaultClient.has_key)
+    touch = instrumented(DefaultClient.touch)
+    expire = instrumented(DefaultClient.expire)
@@ -0,0 +1,28 @@
+"""
+DRF exception handler, also used by ``core.async_api``.
+
+Maps errors raised below the API layer, which are plain exceptions so that
+the admin and management commands do not turn them into 500s or tracebacks,
+to API responses.
+"""
+from rest_framework import exceptions, status
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .hashing import PasswordHashingUnavailable
+
+
+class ServiceBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The server is busy, please try again shortly.'
+    default_code = 'service_busy'
+
+    def __init__(self, wait=None):
+        super().__init__()
+        # DRF's exception handler sends this as Retry-After
+        self.wait = wait
+
+
+def exception_handler(exc, context):
+    if isinstance(exc, PasswordHashingUnavailable):
+        exc = ServiceBusy(wait=exc.retry_after)
+    return drf_exception_handler(exc, context)
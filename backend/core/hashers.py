@@ -0,0 +1,15 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from . import hashing
+
+
+class BoundedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher, holding one of the host's hashing slots
+    (``core.hashing``) while it hashes inside ``hashing.limited()``. The
+    algorithm name is unchanged, so existing password hashes keep verifying.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        with hashing.admission():
+            return super().encode(password, salt, iterations)
@@ -0,0 +1,205 @@
+"""
+Host-wide admission limit for password hashing.
+
+PBKDF2 is CPU bound and takes tens of milliseconds per call. gunicorn's sync
+workers serve one request each, so a login storm can occupy every worker
+process and starve unrelated endpoints; a thread pool inside each process
+cannot prevent that, because the request still holds its worker while it
+waits for the hash. Instead, a hash computed inside ``limited()`` (the
+token, register, change-password and reset views) first takes one of
+``PASSWORD_HASHING_CONCURRENCY`` slots shared by every worker process on the
+host. When all are taken, up to ``PASSWORD_HASHING_QUEUE_DEPTH`` more
+requests wait at most ``PASSWORD_HASHING_MAX_WAIT`` seconds for one, and
+anything beyond that is rejected at once with ``PasswordHashingUnavailable``,
+so its worker is free again within milliseconds. ``core.exceptions`` turns
+that into a 503 with ``Retry-After`` for DRF and async views.
+
+The defaults are sized from the server: at most half of the host's request
+slots (``SERVER_WORKERS`` x ``SERVER_THREADS``, which ``gunicorn.conf.py``
+exports) go to password hashing, at most one per CPU hashing and the rest
+waiting. The other half keeps serving everything else during a storm. With
+gunicorn's default of one sync worker there is nothing to keep free, so one
+hash runs at a time; the limit protects other endpoints once the deployment
+runs several workers or threads (``WEB_CONCURRENCY``).
+
+Slots are Redis sorted sets keyed by host name, each entry leased so a worker
+killed mid-hash cannot hold its slot for good. Without Redis (tests, local
+development with the locmem cache) the limit is per process, and when Redis
+errors the hash is allowed, as the throttles do. Hashes outside
+``limited()`` (admin login, ``createsuperuser``, ``changepassword``) are
+never limited or rejected.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from redis.exceptions import RedisError
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Longer than any hash; frees the slot of a worker that died holding it
+LEASE_SECONDS = 30
+POLL_SECONDS = 0.01
+
+# KEYS: slot set
+# ARGV: slot count, now, lease expiry, holder
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+redis.call('EXPIRE', KEYS[1], %d)
+return 1
+""" % LEASE_SECONDS
+
+_limited = ContextVar('password_hashing_limited', default=False)
+
+
+class PasswordHashingUnavailable(Exception):
+    """Every hashing slot on this host is taken; retry after ``retry_after`` seconds"""
+    retry_after = 1
+
+
+def concurrency():
+    return settings.PASSWORD_HASHING_CONCURRENCY or min(os.cpu_count() or 1, _budget())
+
+
+def queue_depth():
+    configured = settings.PASSWORD_HASHING_QUEUE_DEPTH
+    return configured if configured is not None else max(0, _budget() - concurrency())
+
+
+def _budget():
+    """Requests on this host that may be busy with password hashing at once"""
+    return max(1, settings.SERVER_WORKERS * settings.SERVER_THREADS // 2)
+
+
+class RedisSlots:
+    """Counting semaphore shared by every process on the host"""
+
+    def __init__(self, name, size):
+        from django_redis import get_redis_connection
+
+        self.size = size
+        self.redis = get_redis_connection('default')
+        self.key = default_cache.make_key(f'password-hashing:{socket.gethostname()}:{name}')
+        self.script = self.redis.register_script(ACQUIRE_SCRIPT)
+
+    def acquire(self):
+        """A holder id, or None when every slot is taken"""
+        holder = uuid.uuid4().hex
+        now = time.time()
+        if self.script(keys=[self.key], args=[self.size, now, now + LEASE_SECONDS, holder]):
+            return holder
+        return None
+
+    def release(self, holder):
+        self.redis.zrem(self.key, holder)
+
+
+class LocalSlots:
+    """Per-process fallback when the default cache is not Redis"""
+
+    def __init__(self, name, size):
+        self.size = size
+        self.semaphore = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        return True if self.semaphore.acquire(blocking=False) else None
+
+    def release(self, holder):
+        self.semaphore.release()
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def get_slots():
+    """(hashing, waiting) slot sets"""
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                try:
+                    _slots = (RedisSlots('hashing', concurrency()), RedisSlots('waiting', queue_depth()))
+                except (ImportError, NotImplementedError):
+                    _slots = (LocalSlots('hashing', concurrency()), LocalSlots('waiting', queue_depth()))
+    return _slots
+
+
+def reset():
+    """Drop the slot sets so the next hash reads the settings again"""
+    global _slots
+    with _slots_lock:
+        _slots = None
+
+
+@contextmanager
+def limited():
+    """Apply the admission limit to every hash computed inside the block"""
+    token = _limited.set(True)
+    try:
+        yield
+    finally:
+        _limited.reset(token)
+
+
+@contextmanager
+def admission():
+    """
+    Hold a hashing slot for the block when inside ``limited()``; raises
+    ``PasswordHashingUnavailable`` if none frees up in time.
+    """
+    if not _limited.get():
+        yield
+        return
+    hashing, waiting = get_slots()
+    try:
+        holder = _admit(hashing, waiting)
+    except RedisError:
+        logger.warning('Password hashing admission failed, allowing the hash', exc_info=True)
+        metrics.record_password_hashing('unchecked')
+        yield
+        return
+    try:
+        yield
+    finally:
+        try:
+            hashing.release(holder)
+        except RedisError:
+            # The lease runs out instead
+            logger.warning('Could not release a password hashing slot', exc_info=True)
+
+
+def _admit(hashing, waiting):
+    holder = hashing.acquire()
+    if holder is not None:
+        metrics.record_password_hashing('admitted')
+        return holder
+    place = waiting.acquire()
+    if place is None:
+        metrics.record_password_hashing('rejected')
+        raise PasswordHashingUnavailable()
+    try:
+        deadline = time.monotonic() + settings.PASSWORD_HASHING_MAX_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            holder = hashing.acquire()
+            if holder is not None:
+                metrics.record_password_hashing('queued')
+                return holder
+    finally:
+        waiting.release(place)
+    metrics.record_password_hashing('timed_out')
+    raise PasswordHashingUnavailable()
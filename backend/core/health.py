@@ -0,0 +1,241 @@
+"""
+Dependency health probes behind ``/livez``, ``/readyz`` and ``/health/``.
+
+Probing the database and Redis inside every load balancer request costs a
+round trip per dependency per probe per node. Instead a daemon thread runs
+the probes every ``HEALTH_PROBE_INTERVAL`` seconds and the views serve the
+latest results, so a probe request never waits on a dependency (only the
+very first one in a process does). Redis is reached through django-redis's
+connection pool rather than a new client per check.
+
+Every result carries the probe's latency. The database probe also reports
+connection saturation on PostgreSQL (backends of this database against
+``max_connections``), and the cache probe reports the client pool's
+connections in use, Redis memory use and keys evicted since the previous
+probe. Those indicators turn the status ``degraded`` once they cross
+``HEALTH_SATURATION_WARNING``, which still counts as ready: taking nodes
+out of rotation because a shared dependency is busy only makes it worse.
+
+Only the status and each probe's latency are public; the full report,
+with errors and saturation figures, is for monitoring requests (see
+``is_monitoring_request()``).
+
+Readiness fails when a probe failed or its result is older than
+``HEALTH_PROBE_STALE_AFTER`` seconds, which also covers a probe hanging on
+a dead dependency. Liveness never touches a dependency.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5
+DEFAULT_SATURATION_WARNING = 0.9
+
+PROBE_KEY = 'core:health:probe'
+
+
+def get_interval():
+    return getattr(settings, 'HEALTH_PROBE_INTERVAL', DEFAULT_INTERVAL)
+
+
+def get_stale_after():
+    return getattr(settings, 'HEALTH_PROBE_STALE_AFTER', None) or 3 * get_interval()
+
+
+def get_saturation_warning():
+    return getattr(settings, 'HEALTH_SATURATION_WARNING', DEFAULT_SATURATION_WARNING)
+
+
+def ratio(part, whole):
+    return round(part / whole, 3) if whole else None
+
+
+def check_database(previous):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        if connection.vendor != 'postgresql':
+            return {}
+        cursor.execute('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()')
+        (connections,) = cursor.fetchone()
+        cursor.execute('SHOW max_connections')
+        max_connections = int(cursor.fetchone()[0])
+    return {
+        'connections': connections,
+        'max_connections': max_connections,
+        'saturation': ratio(connections, max_connections),
+    }
+
+
+def release_connection():
+    """
+    Keep the probe thread's database connection between rounds, unless it
+    broke. Not ``close_if_unusable_or_obsolete()``: with the default
+    ``CONN_MAX_AGE`` of 0 every connection is obsolete at once, so that
+    would still open a new one per round.
+    """
+    if connection.connection is not None and not connection.is_usable():
+        connection.close()
+
+
+def redis_client():
+    """django-redis's pooled client for the default cache, or None"""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def check_cache(previous):
+    client = redis_client()
+    if client is None:
+        # Any other backend: one read, no write
+        cache.get(PROBE_KEY)
+        return {}
+
+    client.ping()
+    stats, memory = client.info('stats'), client.info('memory')
+    pool = client.connection_pool
+    in_use = len(getattr(pool, '_in_use_connections', ()))
+    max_connections = getattr(pool, 'max_connections', None)
+    evicted = stats.get('evicted_keys', 0)
+    previous_evicted = previous.get('evicted_keys')
+    return {
+        'pool_in_use': in_use,
+        'pool_max': max_connections,
+        'pool_saturation': ratio(in_use, max_connections),
+        'used_memory': memory.get('used_memory'),
+        'maxmemory': memory.get('maxmemory') or None,
+        'memory_usage': ratio(memory.get('used_memory', 0), memory.get('maxmemory')),
+        'evicted_keys': evicted,
+        'evictions': evicted - previous_evicted if previous_evicted is not None else 0,
+    }
+
+
+def run_probe(check, previous):
+    started = time.perf_counter()
+    try:
+        result = {'ok': True, **check(previous)}
+    except Exception as e:
+        result = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    result['checked_at'] = time.time()
+    return result
+
+
+def warnings_for(name, result):
+    """Indicator names over the warning threshold, plus any evictions"""
+    threshold = get_saturation_warning()
+    found = [
+        f'{name}.{indicator}' for indicator in ('saturation', 'pool_saturation', 'memory_usage')
+        if (result.get(indicator) or 0) >= threshold
+    ]
+    if result.get('evictions'):
+        found.append(f'{name}.evictions')
+    return found
+
+
+class HealthMonitor:
+    """
+    Runs ``probes`` (name -> ``check(previous_result)`` returning extra
+    fields) on a daemon thread and keeps the latest results
+    """
+
+    def __init__(self, probes):
+        self.probes = probes
+        self._lock = threading.Lock()
+        self._results = {}
+        self._thread = None
+        self._pid = None
+
+    def run_probes(self):
+        with self._lock:
+            previous = self._results
+        # Probes get their previous result to report deltas
+        results = {
+            name: run_probe(check, previous.get(name, {}))
+            for name, check in self.probes.items()
+        }
+        with self._lock:
+            self._results = results
+        return results
+
+    def start(self):
+        """Start the probe thread unless it runs in this process already"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name='health-probes', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_probes()
+            except Exception:
+                logger.exception('Health probes failed')
+            finally:
+                release_connection()
+            time.sleep(get_interval())
+
+    def report(self):
+        self.start()
+        with self._lock:
+            results = self._results
+        if not results:
+            results = self.run_probes()
+
+        now, stale_after = time.time(), get_stale_after()
+        checks, warnings = {}, []
+        for name, result in results.items():
+            check = {key: value for key, value in result.items() if key != 'checked_at'}
+            check['age_s'] = round(now - result['checked_at'], 1)
+            if check['ok'] and check['age_s'] > stale_after:
+                check.update(ok=False, error=f'No result for {check["age_s"]}s')
+            checks[name] = check
+            warnings += warnings_for(name, check)
+
+        if not all(check['ok'] for check in checks.values()):
+            status = 'error'
+        elif warnings:
+            status = 'degraded'
+        else:
+            status = 'ok'
+        return {'status': status, 'checks': checks, 'warnings': warnings}
+
+
+def public_report(report):
+    """``report`` without error messages or saturation figures"""
+    return {
+        'status': report['status'],
+        'checks': {
+            name: {'ok': check['ok'], 'latency_ms': check['latency_ms']}
+            for name, check in report['checks'].items()
+        },
+    }
+
+
+def is_monitoring_request(request):
+    """
+    Whether ``request`` may see internal details: it carries
+    ``MONITORING_TOKEN`` as a bearer token or comes from one of
+    ``MONITORING_ALLOWED_IPS``
+    """
+    token = getattr(settings, 'MONITORING_TOKEN', '')
+    if token:
+        scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() == 'bearer' and constant_time_compare(credentials, token):
+            return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'MONITORING_ALLOWED_IPS', ())
+
+
+monitor = HealthMonitor({'database': check_database, 'cache': check_cache})
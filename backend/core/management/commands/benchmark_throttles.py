@@ -0,0 +1,63 @@
+"""
+Benchmark DRF's timestamp-list throttles against the sliding-window counters
+in ``core.throttling``.
+
+Each rate is measured by pushing ``--requests`` checks for one user through
+``UserRateThrottle`` from both implementations. The stock throttle's cost
+grows with the rate, because its cached history holds up to ``rate``
+timestamps. Keys use a scope unique to the run and expire on their own.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework import throttling
+from rest_framework.test import APIRequestFactory
+
+from core import throttling as redis_throttling
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request cost of the stock and Redis sliding-window throttles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rates', nargs='+', default=['100/min', '1000/min', '10000/min'],
+            help='DRF rate strings to measure'
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if redis_throttling.get_script() is None:
+            self.stdout.write(self.style.WARNING(
+                'The default cache is not Redis: the sliding-window throttle falls back to '
+                'the stock implementation'
+            ))
+        request = APIRequestFactory().get('/')
+        request.user = User(pk=0, email='bench-throttle@example.com')
+
+        self.stdout.write(f"{'rate':>10} {'throttle':<16} {'allowed':>8} {'us/check':>9}")
+        for rate in options['rates']:
+            for label, base in (
+                ('stock', throttling.UserRateThrottle),
+                ('sliding window', redis_throttling.UserRateThrottle),
+            ):
+                throttle_class = type('BenchmarkThrottle', (base,), {
+                    'rate': rate, 'scope': f'bench-{uuid.uuid4().hex}',
+                })
+                self._measure(rate, label, throttle_class, request, options['requests'])
+
+    def _measure(self, rate, label, throttle_class, request, requests):
+        allowed = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            # DRF creates the throttle instances per request, so do the same
+            if throttle_class().allow_request(request, None):
+                allowed += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{rate:>10} {label:<16} {allowed:>8} {elapsed / requests * 1_000_000:>9.1f}'
+        )
@@ -0,0 +1,270 @@
+"""
+Load test the student read endpoints under gunicorn (WSGI) and uvicorn (ASGI).
+
+Both servers are started from this checkout with the same settings, worker
+count and database, with throttling switched off (``DISABLE_THROTTLING``).
+Under uvicorn ``core.asgi`` routes the stats, quick-info, by-class, by-status
+and recent-admissions endpoints to ``students.async_views``; under gunicorn
+they are the DRF views. Each deployment then gets identical load: a fixed
+number of keep-alive connections cycling through those endpoints with a
+bearer token for ``--seconds`` after a warm-up. Throughput and the p50/p99
+latency seen by the client are reported per deployment.
+
+The load generator is a small asyncio HTTP/1.1 client, so a single process
+can keep all connections busy without adding dependencies. Pass
+``--wsgi-url``/``--asgi-url`` to measure servers started elsewhere instead
+(they must use the same database and have throttling off).
+
+Servers need committed rows, so the synthetic students and the benchmark
+user are deleted afterwards rather than rolled back.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.tokens import RefreshToken
+from students import counters, result_cache
+from students.management.commands._synthetic import build_students
+from students.models import Student
+
+User = get_user_model()
+
+PREFIX = 'ASGI-BENCH-'
+EMAIL = 'bench-asgi@example.com'
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and p99 latency of the student read endpoints under gunicorn and uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--connections', type=int, default=64, help='Concurrent keep-alive connections')
+        parser.add_argument('--seconds', type=float, default=10.0, help='Measured duration per deployment')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured load before each run')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Server processes')
+        parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--wsgi-port', type=int, default=8101)
+        parser.add_argument('--asgi-port', type=int, default=8102)
+        parser.add_argument('--wsgi-url', help='Measure this running WSGI deployment instead of starting gunicorn')
+        parser.add_argument('--asgi-url', help='Measure this running ASGI deployment instead of starting uvicorn')
+
+    def handle(self, *args, **options):
+        students = list(build_students(options['students'], prefix=PREFIX, seed=7))
+        recent = timezone.now()
+        for student in students[::10]:
+            student.admission_date = recent
+        try:
+            Student.objects.bulk_create(students, batch_size=2000)
+            counters.record_created(students)
+            result_cache.invalidate()
+            user = User.objects.create_user(email=EMAIL, is_staff=True)
+            token = str(RefreshToken.for_user(user).access_token)
+            paths = self.paths(students)
+
+            self.stdout.write(
+                f"{'deployment':<22} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+            )
+            deployments = [
+                ('gunicorn (WSGI)', options['wsgi_url'], self.gunicorn_command, options['wsgi_port'], '0'),
+                ('uvicorn (ASGI)', options['asgi_url'], self.uvicorn_command, options['asgi_port'], '1'),
+            ]
+            for label, url, command, port, asgi in deployments:
+                if url:
+                    self.report(label, self.measure(url, paths, token, options))
+                    continue
+                base_url = f"http://{options['host']}:{port}"
+                server = self.start(command(options, port), asgi)
+                try:
+                    self.wait_until_ready(server, base_url, paths[0], token)
+                    self.report(label, self.measure(base_url, paths, token, options))
+                finally:
+                    server.terminate()
+                    try:
+                        server.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        server.kill()
+        finally:
+            Student.objects.filter(pk__in=[student.pk for student in students]).delete()
+            User.objects.filter(email=EMAIL).delete()
+
+    def paths(self, students):
+        """A mix over the five async endpoints"""
+        paths = ['/api/students/stats/', '/api/students/recent-admissions/']
+        for status_type in ('active', 'inactive', 'graduated'):
+            paths += [f'/api/students/status/{status_type}/', f'/api/students/status/{status_type}/?page=2']
+        for class_name in sorted({student.current_class for student in students})[:4]:
+            paths.append(f'/api/students/class/{quote(class_name)}/')
+        paths += [f'/api/students/quick-info/{quote(student.student_id)}/' for student in students[:8]]
+        return paths
+
+    def gunicorn_command(self, options, port):
+        return [
+            sys.executable, '-m', 'gunicorn', 'core.wsgi',
+            '--bind', f"{options['host']}:{port}",
+            '--workers', str(options['workers']),
+            '--threads', str(options['threads']),
+            '--log-level', 'warning',
+        ]
+
+    def uvicorn_command(self, options, port):
+        return [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--host', options['host'], '--port', str(port),
+            '--workers', str(options['workers']),
+            '--no-access-log', '--log-level', 'warning',
+        ]
+
+    def start(self, command, asgi):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'),
+            'DJANGO_ASGI': asgi,
+            'DISABLE_THROTTLING': '1',
+        }
+        try:
+            return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        except OSError as e:
+            raise CommandError(f'Could not start {command[2]}: {e}')
+
+    def wait_until_ready(self, server, base_url, path, token, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'{server.args[2]} exited with status {server.returncode}')
+            try:
+                status, _ = asyncio.run(fetch_once(base_url, path, token))
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError(f'{server.args[2]} did not answer {path} within {timeout}s')
+
+    def measure(self, base_url, paths, token, options):
+        return asyncio.run(run_load(
+            base_url, paths, token, options['connections'], options['warmup'], options['seconds']
+        ))
+
+    def report(self, label, result):
+        latencies = sorted(result['latencies'])
+        count = len(latencies)
+        p50 = latencies[count // 2] * 1000 if count else 0
+        p99 = latencies[max(0, int(count * 0.99) - 1)] * 1000 if count else 0
+        self.stdout.write(
+            f"{label:<22} {count:>9} {result['errors']:>7} {count / result['elapsed']:>9.1f} "
+            f"{p50:>8.1f} {p99:>8.1f}"
+        )
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection, reopened when the server closes it"""
+
+    def __init__(self, base_url, token=None):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.header = f'Host: {url.netloc}\r\n'
+        if token:
+            self.header += f'Authorization: Bearer {token}\r\n'
+        self.header += 'Accept: application/json\r\nConnection: keep-alive\r\n'
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        status, _, body = await self.request('GET', path)
+        return status, body
+
+    async def request(self, method, path, body=None):
+        """Send a request, with ``body`` (bytes) as JSON; returns status, headers and body"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        request = f'{method} {path} HTTP/1.1\r\n{self.header}'
+        if body is not None:
+            request += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+        self.writer.write(f'{request}\r\n'.encode('latin-1') + (body or b''))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self.read_chunked()
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close' or lines[0].startswith('HTTP/1.0'):
+            self.close()
+        return status, headers, body
+
+    async def read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if not size:
+                await self.reader.readuntil(b'\r\n')
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def fetch_once(base_url, path, token):
+    connection = Connection(base_url, token)
+    try:
+        return await connection.get(path)
+    finally:
+        connection.close()
+
+
+async def run_load(base_url, paths, token, connections, warmup, seconds):
+    """Drive ``connections`` clients for ``warmup + seconds`` and record the measured part"""
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + seconds
+
+    async def client(number):
+        nonlocal errors
+        connection = Connection(base_url, token)
+        index = number
+        while True:
+            request_started = time.perf_counter()
+            if request_started >= stop_at:
+                break
+            try:
+                status, _ = await connection.get(paths[index % len(paths)])
+                ok = status == 200
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                connection.close()
+                ok = False
+            finished = time.perf_counter()
+            if request_started >= measure_from:
+                if ok:
+                    latencies.append(finished - request_started)
+                else:
+                    errors += 1
+            index += 1
+        connection.close()
+
+    await asyncio.gather(*(client(number) for number in range(connections)))
+    return {'latencies': latencies, 'errors': errors, 'elapsed': seconds}
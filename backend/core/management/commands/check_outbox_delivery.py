@@ -0,0 +1,124 @@
+"""
+Exercise ``core.outbox.deliver_batch()`` against Django's locmem email
+backend and fail if the outbox misbehaves.
+
+Checks that due emails are sent once and recorded, that no database
+transaction is open while a message is sent, that a failed message backs off
+without resending the others, that a session the server dropped is reopened
+without costing an attempt, that emails claimed by a worker that died are
+sent once the lease runs out, and that a message out of attempts ends up
+``dead``. Nothing goes over the network. The check commits (the outbox
+commits its claims), so the emails it queues are deleted afterwards.
+"""
+import smtplib
+from datetime import timedelta
+
+from django.core import mail
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core import outbox
+from core.models import OutboxEmail
+
+SUBJECT_PREFIX = '[outbox check]'
+
+
+class FlakyConnection:
+    """
+    locmem backend that fails for ``@fail.invalid`` recipients, notes open
+    transactions and, once ``dropped`` is set, behaves like an SMTP session
+    the server closed until it is closed and reopened
+    """
+
+    def __init__(self):
+        self.backend = mail.get_connection('django.core.mail.backends.locmem.EmailBackend')
+        self.sent_in_transaction = 0
+        self.dropped = False
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        self.dropped = False
+
+    def send_messages(self, messages):
+        if self.dropped:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        if connection.in_atomic_block:
+            self.sent_in_transaction += 1
+        for message in messages:
+            if any(recipient.endswith('@fail.invalid') for recipient in message.to):
+                raise ConnectionError('recipient refused')
+        return self.backend.send_messages(messages)
+
+
+class Command(BaseCommand):
+    help = 'Check outbox delivery, retries and crash recovery against the locmem email backend'
+
+    def handle(self, *args, **options):
+        mail.outbox = []
+        self.failures = []
+        try:
+            self._run()
+        finally:
+            OutboxEmail.objects.filter(subject__startswith=SUBJECT_PREFIX).delete()
+        if self.failures:
+            raise CommandError('Outbox check failed:\n  ' + '\n  '.join(self.failures))
+        self.stdout.write(self.style.SUCCESS('Outbox delivery behaves as expected'))
+
+    def expect(self, label, actual, expected):
+        self.stdout.write(f'{label:<52} {actual}')
+        if actual != expected:
+            self.failures.append(f'{label}: expected {expected}, got {actual}')
+
+    def enqueue(self, name, recipient):
+        return outbox.enqueue(f'{SUBJECT_PREFIX} {name}', 'Body', [recipient])
+
+    def sent_subjects(self):
+        return sorted(message.subject.removeprefix(SUBJECT_PREFIX).strip() for message in mail.outbox)
+
+    def _run(self):
+        if OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=timezone.now()).exists():
+            raise CommandError('Other emails are due; run this check against an empty outbox')
+        mail_connection = FlakyConnection()
+
+        self.enqueue('first', 'a@example.com')
+        failing = self.enqueue('failing', 'b@fail.invalid')
+        self.enqueue('second', 'c@example.com')
+        self.expect('first batch', outbox.deliver_batch(mail_connection), {'sent': 2, 'retried': 1, 'dead': 0})
+        self.expect('messages delivered', self.sent_subjects(), ['first', 'second'])
+        self.expect('sends inside a database transaction', mail_connection.sent_in_transaction, 0)
+        failing.refresh_from_db()
+        self.expect('failed email backs off', (
+            failing.status, failing.attempts, failing.next_attempt_at > timezone.now(), bool(failing.last_error)
+        ), ('pending', 1, True, True))
+
+        self.expect('second batch', outbox.deliver_batch(mail_connection), {'sent': 0, 'retried': 0, 'dead': 0})
+        self.expect('nothing resent', len(mail.outbox), 2)
+
+        # The server drops the session while the worker is idle
+        idle = self.enqueue('after idle', 'e@example.com')
+        mail_connection.dropped = True
+        self.expect('batch after a dropped session', outbox.deliver_batch(mail_connection), {
+            'sent': 1, 'retried': 0, 'dead': 0,
+        })
+        idle.refresh_from_db()
+        self.expect('reconnected, one attempt counted', (mail_connection.opened, idle.attempts), (1, 1))
+
+        # A worker claims an email and dies before sending it
+        orphan = self.enqueue('orphan', 'd@example.com')
+        self.expect('claimed by the dead worker', [email.pk for email in outbox.claim(10)], [orphan.pk])
+        self.expect('leased email skipped', outbox.deliver_batch(mail_connection)['sent'], 0)
+        OutboxEmail.objects.filter(pk=orphan.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.expect('sent once the lease ran out', outbox.deliver_batch(mail_connection)['sent'], 1)
+        self.expect('orphan delivered once', self.sent_subjects().count('orphan'), 1)
+
+        # Out of attempts
+        OutboxEmail.objects.filter(pk=failing.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.expect('last attempt', outbox.deliver_batch(mail_connection, max_attempts=2), {
+            'sent': 0, 'retried': 0, 'dead': 1,
+        })
+        failing.refresh_from_db()
+        self.expect('failed email dead', (failing.status, failing.attempts), ('dead', 2))
@@ -0,0 +1,67 @@
+"""
+Worker that drains the email outbox (``core.outbox``).
+
+Back-to-back batches are sent over one backend connection, which is
+reopened after a batch had failures. The connection is closed before the
+worker sleeps, so an idle SMTP session is never left for the server to drop.
+Runs until interrupted unless ``--once`` is given, in which case it exits
+when nothing is due.
+"""
+import signal
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=outbox.DEFAULT_MAX_ATTEMPTS)
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep when no email is due'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once nothing is due')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        mail_connection = get_connection()
+        totals = {'sent': 0, 'retried': 0, 'dead': 0}
+        try:
+            while self.running:
+                mail_connection.open()
+                result = outbox.deliver_batch(
+                    mail_connection, options['batch_size'], options['max_attempts']
+                )
+                for key, value in result.items():
+                    totals[key] += value
+                if result['retried'] or result['dead']:
+                    # Start the next batch on a fresh connection
+                    mail_connection.close()
+                if any(result.values()):
+                    self.stdout.write(
+                        f"sent {result['sent']}, retrying {result['retried']}, dead {result['dead']}"
+                    )
+                if sum(result.values()) < options['batch_size']:
+                    mail_connection.close()
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        finally:
+            mail_connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox worker stopped: sent {totals['sent']}, retried {totals['retried']}, "
+            f"dead {totals['dead']}"
+        ))
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,235 @@
+"""
+Prometheus metrics for the API, exported at ``/metrics``.
+
+``MetricsMiddleware`` labels every request with its URL name (for example
+``students:student-list-create`` or ``token_obtain_pair``) and records:
+
+* ``django_http_requests_total`` by view, method and status code
+* ``django_http_request_duration_seconds``, a latency histogram by view
+* ``django_http_request_db_queries`` and ``django_http_request_db_seconds``,
+  per request SQL query count and time. An execute wrapper is installed on
+  every database connection as it opens, in whichever thread opens it, and
+  charges queries to the request in the current context, so queries the
+  async ORM runs in ``sync_to_async`` threads count too
+* ``django_http_request_render_seconds`` (``ORJSONRenderer``) and
+  ``django_http_request_serialize_seconds`` (serializers using
+  ``core.serializers.TimedSerializerMixin`` and the student list encoders)
+* ``django_cache_operations_total`` by view, operation and result (hit, miss,
+  ok or error) and ``django_cache_operation_seconds`` by operation, reported
+  by ``core.cache.InstrumentedRedisClient``
+* ``password_hashing_admissions_total`` by outcome (admitted, queued,
+  rejected, timed_out or unchecked), from ``core.hashing``
+
+With several gunicorn or uvicorn worker processes, set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory shared by the workers
+(``gunicorn.conf.py`` empties it at start-up). Each process then writes its
+samples there and ``/metrics`` aggregates all of them, whichever worker
+answers the scrape. ``/metrics`` only answers monitoring requests, see
+``core.health.is_monitoring_request()``.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    # Management commands may record cache metrics before any server created it
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+UNRESOLVED = '<unresolved>'
+NO_REQUEST = '<none>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUESTS = Counter(
+    'django_http_requests_total', 'Requests by view, method and status code',
+    ['view', 'method', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'django_http_request_duration_seconds', 'Request latency by view',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'django_http_request_db_queries', 'SQL queries per request by view',
+    ['view'], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    'django_http_request_db_seconds', 'SQL time per request by view',
+    ['view'], buckets=PHASE_BUCKETS,
+)
+PHASE_SECONDS = {
+    phase: Histogram(
+        f'django_http_request_{phase}_seconds', f'Time spent in {phase} per request by view',
+        ['view'], buckets=PHASE_BUCKETS,
+    )
+    for phase in ('render', 'serialize')
+}
+CACHE_OPERATIONS = Counter(
+    'django_cache_operations_total', 'Cache operations by view, operation and result',
+    ['view', 'operation', 'result'],
+)
+CACHE_SECONDS = Histogram(
+    'django_cache_operation_seconds', 'Cache operation latency',
+    ['operation'], buckets=PHASE_BUCKETS,
+)
+PASSWORD_HASHING = Counter(
+    'password_hashing_admissions_total', 'Limited password hashes by admission outcome (core.hashing)',
+    ['outcome'],
+)
+
+_current = ContextVar('request_metrics', default=None)
+_active_phases = ContextVar('request_metrics_phases', default=frozenset())
+
+
+class RequestMetrics:
+    """What one request spent, filled in while it runs"""
+    __slots__ = ('request', 'queries', 'db_seconds', 'phases')
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+
+    @property
+    def view(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match is not None else UNRESOLVED
+
+    def observe(self, response, seconds):
+        view, method = self.view, self.request.method
+        REQUESTS.labels(view, method, response.status_code).inc()
+        REQUEST_DURATION.labels(view, method).observe(seconds)
+        DB_QUERIES.labels(view).observe(self.queries)
+        DB_SECONDS.labels(view).observe(self.db_seconds)
+        for phase, phase_seconds in self.phases.items():
+            PHASE_SECONDS[phase].labels(view).observe(phase_seconds)
+
+
+def add_phase(phase, seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.phases[phase] = metrics.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    """
+    Count the enclosed block towards the current request's ``phase``. Nested
+    blocks of the same phase are counted once, by the outermost.
+    """
+    active = _active_phases.get()
+    if phase in active:
+        yield
+        return
+    token = _active_phases.set(active | {phase})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active_phases.reset(token)
+        add_phase(phase, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper charging the query to the request in the current context"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_wrapper(sender=None, connection=None, **kwargs):
+    """
+    ``connection_created`` receiver. Connection objects are per thread, so
+    the wrapper goes on each one in the thread that opened it.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_wrapper, dispatch_uid='core.metrics.install_query_wrapper')
+# Connections opened before this module was imported
+for _connection in connections.all(initialized_only=True):
+    install_query_wrapper(connection=_connection)
+
+
+def record_cache(operation, result, seconds=None, count=1):
+    """Count ``count`` cache results and, unless None, observe the call's latency"""
+    metrics = _current.get()
+    if count:
+        view = metrics.view if metrics is not None else NO_REQUEST
+        CACHE_OPERATIONS.labels(view, operation, result).inc(count)
+    if seconds is not None:
+        CACHE_SECONDS.labels(operation).observe(seconds)
+
+
+def record_password_hashing(outcome):
+    PASSWORD_HASHING.labels(outcome).inc()
+
+
+class MetricsMiddleware:
+    """
+    Record the request metrics above. Goes first in ``MIDDLEWARE`` so the
+    latency covers the whole middleware stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.observe(response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        metrics, token, started = self.begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.observe(response, time.perf_counter() - started)
+        return response
+
+    def begin(self, request):
+        metrics = RequestMetrics(request)
+        return metrics, _current.set(metrics), time.perf_counter()
+
+
+def get_registry():
+    """The registry to export: every worker's samples in multiprocess mode"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def export():
+    """``(body, content_type)`` in the Prometheus text format"""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
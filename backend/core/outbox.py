@@ -0,0 +1,145 @@
+"""
+Transactional email outbox.
+
+Views call ``enqueue()`` instead of ``send_mail()``: the email becomes an
+``OutboxEmail`` row in the current transaction, so requests never wait on
+SMTP and a rolled-back request sends nothing. The ``send_outbox_emails``
+worker calls ``deliver_batch()``, which works in three steps so no database
+transaction or row lock is held while talking to SMTP:
+
+1. claim: one short transaction locks due rows (``SKIP LOCKED`` where the
+   database supports it, so several workers can run), counts the attempt and
+   leases the rows by moving ``next_attempt_at`` ``CLAIM_LEASE`` ahead;
+2. send each message over a single reused backend connection, outside any
+   transaction. If the SMTP server has dropped the session (it does after
+   an idle period) the connection is reopened and the message sent again,
+   without counting another attempt;
+3. record each outcome right after its send with one ``UPDATE``.
+
+A worker that dies mid-batch leaves only its unrecorded messages claimed;
+they become due again when the lease runs out, so at most those are sent
+twice. Failed messages are retried with exponential backoff until
+``max_attempts``, then left as ``dead`` for an admin to inspect and requeue.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 6
+
+# Retry delays: 30s, 1m, 2m, 4m, ... capped at an hour
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+# How long claimed emails stay out of other workers' batches; must exceed
+# the time one batch takes to send
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def enqueue(subject, message, recipient_list, from_email=None, html_message=None):
+    """Queue an email; takes the same arguments as ``send_mail()``"""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def build_message(email, mail_connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients,
+        connection=mail_connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def send(email, mail_connection):
+    message = build_message(email, mail_connection)
+    try:
+        mail_connection.send_messages([message])
+    except smtplib.SMTPServerDisconnected:
+        # The server closed the session, not a problem with this message
+        mail_connection.close()
+        mail_connection.open()
+        mail_connection.send_messages([message])
+
+
+def due_emails(batch_size):
+    queryset = OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.order_by('next_attempt_at')[:batch_size])
+
+
+def claim(batch_size):
+    """Lease up to ``batch_size`` due emails to this worker and count the attempt"""
+    with transaction.atomic():
+        emails = due_emails(batch_size)
+        lease_until = timezone.now() + CLAIM_LEASE
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = lease_until
+        OutboxEmail.objects.bulk_update(emails, ['attempts', 'next_attempt_at'])
+    return emails
+
+
+def record(email, error, max_attempts):
+    """Store the outcome of one send and return ``'sent'``, ``'retried'`` or ``'dead'``"""
+    now = timezone.now()
+    if error is None:
+        changes = {'status': 'sent', 'sent_at': now, 'last_error': ''}
+        outcome = 'sent'
+    elif email.attempts >= max_attempts:
+        changes = {'status': 'dead', 'last_error': error}
+        outcome = 'dead'
+        logger.error('Outbox email %s dead after %s attempts: %s', email.pk, email.attempts, error)
+    else:
+        changes = {'next_attempt_at': now + backoff(email.attempts), 'last_error': error}
+        outcome = 'retried'
+    OutboxEmail.objects.filter(pk=email.pk).update(**changes)
+    return outcome
+
+
+def deliver_batch(mail_connection, batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Send up to ``batch_size`` due emails over ``mail_connection`` (an opened
+    backend from ``get_connection()``). Returns ``{'sent', 'retried', 'dead'}``.
+    """
+    outcome = {'sent': 0, 'retried': 0, 'dead': 0}
+    for email in claim(batch_size):
+        error = None
+        try:
+            # One message per call so a failure only affects its own row
+            send(email, mail_connection)
+        except Exception as exc:
+            error = f'{type(exc).__name__}: {exc}'
+        outcome[record(email, error, max_attempts)] += 1
+    return outcome
+
+
+def requeue(queryset):
+    """Give dead emails a fresh set of attempts"""
+    return queryset.filter(status='dead').update(
+        status='pending', attempts=0, next_attempt_at=timezone.now(), last_error=''
+    )
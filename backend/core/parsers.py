@@ -0,0 +1,24 @@
+"""
+orjson-backed parser for the REST API.
+"""
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in replacement for ``JSONParser``.
+
+    orjson only accepts UTF-8 and, like the strict stdlib parser, rejects
+    ``NaN`` and ``Infinity``.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
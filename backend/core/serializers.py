@@ -0,0 +1,16 @@
+"""
+Serializer helpers shared by the apps.
+"""
+from . import metrics
+
+
+class TimedSerializerMixin:
+    """
+    Report ``to_representation()`` as the request's serialize time (see
+    ``core.metrics``). Nested and ``many=True`` serializers are counted once,
+    by the outermost call.
+    """
+
+    def to_representation(self, instance):
+        with metrics.timed('serialize'):
+            return super().to_representation(instance)
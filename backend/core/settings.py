@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -61,11 +62,13 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',  # First, so request latency covers every middleware
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise middleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.RateLimitHeadersMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -123,6 +126,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Requests this host serves at once; gunicorn.conf.py exports both, uvicorn
+# reads WEB_CONCURRENCY as its worker count. Both servers default to one worker
+SERVER_WORKERS = int(os.getenv('WEB_CONCURRENCY', '0')) or 1
+SERVER_THREADS = int(os.getenv('GUNICORN_THREADS', '0')) or 1
+
+# Hashes in the token, register and password views take one of a host-wide
+# set of slots (core.hashing), so a login storm cannot occupy every worker;
+# requests that find no slot within the wait get a 503
+PASSWORD_HASHERS = [
+    'core.hashers.BoundedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# default: CPU count, capped at half of SERVER_WORKERS x SERVER_THREADS
+PASSWORD_HASHING_CONCURRENCY = int(os.getenv('PASSWORD_HASHING_CONCURRENCY', '0')) or None
+# default: the rest of that half
+PASSWORD_HASHING_QUEUE_DEPTH = (
+    int(os.environ['PASSWORD_HASHING_QUEUE_DEPTH']) if os.getenv('PASSWORD_HASHING_QUEUE_DEPTH') else None
+)
+PASSWORD_HASHING_MAX_WAIT = float(os.getenv('PASSWORD_HASHING_MAX_WAIT', '1'))  # seconds
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -168,13 +194,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    # Sliding-window counters in Redis, see core.throttling
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonRateThrottle',
+        'core.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        'login': '10/min',
+        'search': '120/min',
+        'bulk': '20/hour',
     }
 }
 
@@ -286,7 +316,7 @@ CACHES = {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': f'redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1',  # Using DB 1 for sessions
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'CLIENT_CLASS': 'core.cache.InstrumentedRedisClient',  # django-redis plus cache metrics
             'PASSWORD': REDIS_PASSWORD,
             'SOCKET_CONNECT_TIMEOUT': 5,  # seconds
             'SOCKET_TIMEOUT': 5,  # seconds
@@ -312,7 +342,7 @@ DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -321,14 +351,30 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    # orjson for JSON; the browsable API is only offered while debugging
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Sliding-window counters in Redis, see core.throttling
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonRateThrottle',
+        'core.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
-    }
+        'user': '1000/day',
+        'login': '10/min',
+        'search': '120/min',
+        'bulk': '20/hour',
+    },
+    # Maps core errors that are not APIExceptions, e.g. a full password
+    # hashing limit, to responses
+    'EXCEPTION_HANDLER': 'core.exceptions.exception_handler',
 }
 
 # JWT settings
@@ -346,6 +392,8 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Rotated refresh tokens are blacklisted in the cache (accounts.tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
 # Logging
@@ -353,13 +401,15 @@ SIMPLE_JWT = {
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', 's3cure_redis_pass_123!')
 REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
 REDIS_PORT = os.getenv('REDIS_PORT', '6379')
+TOKEN_REDIS_HOST = os.getenv('TOKEN_REDIS_HOST', 'redis-tokens')
+TOKEN_REDIS_PORT = os.getenv('TOKEN_REDIS_PORT', '6379')
 
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': f'redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1',
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'CLIENT_CLASS': 'core.cache.InstrumentedRedisClient',  # django-redis plus cache metrics
             'PASSWORD': REDIS_PASSWORD,
             'SOCKET_CONNECT_TIMEOUT': 5,  # seconds
             'SOCKET_TIMEOUT': 5,  # seconds
@@ -371,7 +421,21 @@ CACHES = {
         },
         'KEY_PREFIX': 'school',
         'TIMEOUT': 60 * 60 * 24,  # 24 hours
-    }
+    },
+    # Revoked refresh tokens (accounts.tokens). They are the only record of a
+    # revocation, so they live on a Redis that never evicts (noeviction in
+    # docker-compose.yml) and errors are raised, not ignored
+    'token_blacklist': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': f'redis://:{REDIS_PASSWORD}@{TOKEN_REDIS_HOST}:{TOKEN_REDIS_PORT}/0',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'core.cache.InstrumentedRedisClient',
+            'PASSWORD': REDIS_PASSWORD,
+            'SOCKET_CONNECT_TIMEOUT': 5,  # seconds
+            'SOCKET_TIMEOUT': 5,  # seconds
+        },
+        'KEY_PREFIX': 'school',
+    },
 }
 
 # Session configuration
@@ -387,6 +451,42 @@ SESSION_CACHE_ALIAS = 'default'
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
 SESSION_SAVE_EVERY_REQUEST = True  # Save the session to the cache on every request
 
+# Warm the in-process student autocomplete index when a server worker starts
+STUDENT_AUTOCOMPLETE_WARM_ON_STARTUP = True
+
+# Seconds to keep cached student list/search results (0 disables the cache)
+STUDENT_RESULT_CACHE_TIMEOUT = 300
+
+# Seconds token authentication may reuse a cached user (see accounts.user_cache);
+# every save of the user expires the cached copies immediately
+USER_CACHE_TIMEOUT = 60
+USER_CACHE_LOCAL_SIZE = 1024
+
+# Seconds between the background dependency probes behind /readyz (see
+# core.health); results older than three intervals fail readiness
+HEALTH_PROBE_INTERVAL = 5
+# Saturation and memory ratios at which /readyz reports "degraded"
+HEALTH_SATURATION_WARNING = 0.9
+
+# Requests allowed to scrape /metrics and see the detailed /readyz report:
+# a bearer token (unset disables it) or one of these client addresses
+MONITORING_TOKEN = os.getenv('MONITORING_TOKEN', '')
+MONITORING_ALLOWED_IPS = [ip for ip in os.getenv('MONITORING_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip]
+
+# Serve the hot student read endpoints from the native async views in
+# students.async_views. core/asgi.py sets DJANGO_ASGI=1, so this is on under
+# uvicorn and off under gunicorn's WSGI workers.
+ASGI_DEPLOYMENT = os.getenv('DJANGO_ASGI', '0') == '1'
+STUDENT_ASYNC_READ_VIEWS = ASGI_DEPLOYMENT
+if ASGI_DEPLOYMENT:
+    # WhiteNoise is sync-only and would run every request through Django's
+    # single sync thread; nginx serves /static/ from STATIC_ROOT instead
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
+# Load tests (benchmark_wsgi_asgi) switch every throttle off
+if os.getenv('DISABLE_THROTTLING', '0') == '1':
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = dict.fromkeys(REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'])
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
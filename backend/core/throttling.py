@@ -0,0 +1,211 @@
+"""
+Redis sliding-window throttles.
+
+DRF's ``SimpleRateThrottle`` keeps a list of request timestamps per client in
+the cache and reads, trims and rewrites it on every request, which is
+O(rate) work and racy across workers. The throttles here keep one counter per
+client per fixed window and estimate the sliding window as
+
+    previous_window_count * (1 - elapsed_fraction) + current_window_count
+
+The check and the increment run as one Lua script, so concurrent workers
+cannot both take the last slot. When the ``default`` cache is not Redis the
+classes fall back to DRF's implementation, and when Redis errors the request
+is allowed, like the cache's ``IGNORE_EXCEPTIONS`` setting does elsewhere.
+
+Async views call ``aallow_request()``, which runs the same script through a
+``redis.asyncio`` client (one per event loop) instead of blocking the loop.
+
+Every throttle records its limit, remaining requests and reset time on the
+request; ``core.middleware.RateLimitHeadersMiddleware`` turns the most
+restrictive one into ``X-RateLimit-*`` headers.
+"""
+import asyncio
+import logging
+import math
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from redis.exceptions import RedisError
+from rest_framework import throttling
+
+logger = logging.getLogger(__name__)
+
+# KEYS: current window, previous window
+# ARGV: limit, weight of the previous window, counter TTL in seconds
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local weight = tonumber(ARGV[2])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * weight + current + 1 > limit then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+end
+return {1, current, previous}
+"""
+
+_script = None
+
+
+def get_script():
+    """The registered Lua script, or None when the default cache is not Redis"""
+    global _script
+    if _script is None:
+        try:
+            from django_redis import get_redis_connection
+            _script = get_redis_connection('default').register_script(SLIDING_WINDOW_SCRIPT)
+        except (ImportError, NotImplementedError):
+            _script = False
+    return _script or None
+
+
+_async_scripts = weakref.WeakKeyDictionary()
+
+
+def get_async_script():
+    """
+    The script registered on a ``redis.asyncio`` client for the running
+    event loop, or None when the default cache is not Redis. asyncio
+    connections cannot be shared between loops, hence one client per loop.
+    """
+    if get_script() is None:
+        return None
+    loop = asyncio.get_running_loop()
+    script = _async_scripts.get(loop)
+    if script is None:
+        from redis.asyncio import Redis
+
+        config = settings.CACHES['default']
+        options = config.get('OPTIONS', {})
+        client = Redis.from_url(
+            config['LOCATION'],
+            password=options.get('PASSWORD') or None,
+            socket_timeout=options.get('SOCKET_TIMEOUT'),
+            socket_connect_timeout=options.get('SOCKET_CONNECT_TIMEOUT'),
+        )
+        script = _async_scripts[loop] = client.register_script(SLIDING_WINDOW_SCRIPT)
+    return script
+
+
+def record_rate_limit(request, limit, remaining, reset):
+    """Keep the most restrictive limit seen for ``request``"""
+    http_request = getattr(request, '_request', request)
+    current = getattr(http_request, 'rate_limit', None)
+    if current is None or remaining < current['remaining']:
+        http_request.rate_limit = {
+            'limit': limit, 'remaining': max(0, remaining), 'reset': max(0, math.ceil(reset)),
+        }
+
+
+class RedisRateThrottle(throttling.SimpleRateThrottle):
+    """Sliding-window counter throttle, see the module docstring"""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        script = get_script()
+        if script is None:
+            return self._allow_from_history(request, view)
+
+        call = self._prepare(request, view)
+        if call is None:
+            return True
+        try:
+            result = script(**call)
+        except RedisError:
+            logger.warning('Rate limit check failed for %s, allowing request', self.key, exc_info=True)
+            return True
+        return self._apply(request, result)
+
+    async def aallow_request(self, request, view):
+        """``allow_request()`` for async views"""
+        if self.rate is None:
+            return True
+        script = get_async_script()
+        if script is None:
+            return await sync_to_async(self._allow_from_history)(request, view)
+
+        call = self._prepare(request, view)
+        if call is None:
+            return True
+        try:
+            result = await script(**call)
+        except RedisError:
+            logger.warning('Rate limit check failed for %s, allowing request', self.key, exc_info=True)
+            return True
+        return self._apply(request, result)
+
+    def _prepare(self, request, view):
+        """Keys and arguments of the script call, or None if not throttled"""
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return None
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now, self.duration)
+        key = default_cache.make_key(self.key)
+        self.weight = 1 - self.elapsed / self.duration
+        return {
+            'keys': [f'{key}:{int(window)}', f'{key}:{int(window) - 1}'],
+            'args': [self.num_requests, self.weight, 2 * self.duration],
+        }
+
+    def _apply(self, request, result):
+        allowed, current, previous = result
+        until_next_window = self.duration - self.elapsed
+        if allowed:
+            self._wait = None
+        elif current + 1 > self.num_requests:
+            self._wait = until_next_window
+        else:
+            # Wait for the previous window's share to decay far enough
+            decayed_weight = (self.num_requests - 1 - current) / previous
+            self._wait = max(0.0, (1 - decayed_weight) * self.duration - self.elapsed)
+
+        estimate = previous * self.weight + current
+        record_rate_limit(
+            request, self.num_requests, self.num_requests - math.ceil(estimate), until_next_window
+        )
+        return bool(allowed)
+
+    def _allow_from_history(self, request, view):
+        allowed = super().allow_request(request, view)
+        history = getattr(self, 'history', None)
+        if history is not None:
+            reset = self.duration - (self.now - history[-1]) if history else self.duration
+            record_rate_limit(request, self.num_requests, self.num_requests - len(history), reset)
+        self._wait = None if allowed else super().wait()
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonRateThrottle(RedisRateThrottle, throttling.AnonRateThrottle):
+    """Limits anonymous clients by IP (``anon`` scope)"""
+
+
+class UserRateThrottle(RedisRateThrottle, throttling.UserRateThrottle):
+    """Limits users by id, anonymous clients by IP (``user`` scope)"""
+
+
+class LoginRateThrottle(RedisRateThrottle):
+    """Limits token requests by client IP, authenticated or not"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class SearchRateThrottle(UserRateThrottle):
+    scope = 'search'
+
+
+class BulkRateThrottle(UserRateThrottle):
+    scope = 'bulk'
@@ -0,0 +1,64 @@
+"""
+Dirty-field tracking for models whose signal handlers should only write
+when something relevant actually changed.
+"""
+
+
+class DirtyFieldsMixin:
+    """
+    Remember the field values an instance was loaded (or last saved) with.
+
+    ``get_dirty_fields()`` compares the current values against that snapshot.
+    Deferred fields join the snapshot when they are loaded. Every field of an
+    instance that was never loaded from the database counts as dirty.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def _snapshot_fields(self, fields=None):
+        if not hasattr(self, '_loaded_values'):
+            self._loaded_values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (fields is None or field.attname in fields):
+                self._loaded_values[field.attname] = self.__dict__[field.attname]
+
+    def __getstate__(self):
+        # Copies and unpickled instances get their own snapshot
+        state = super().__getstate__()
+        if '_loaded_values' in state:
+            state['_loaded_values'] = dict(state['_loaded_values'])
+        return state
+
+    def get_dirty_fields(self, fields=None):
+        """Attnames (optionally limited to ``fields``) that differ from the snapshot"""
+        loaded = getattr(self, '_loaded_values', None)
+        dirty = set()
+        for field in self._meta.concrete_fields:
+            attname = field.attname
+            if fields is not None and attname not in fields and field.name not in fields:
+                continue
+            if attname not in self.__dict__:
+                continue
+            if loaded is None or attname not in loaded or loaded[attname] != self.__dict__[attname]:
+                dirty.add(attname)
+        return dirty
+
+    def has_changed(self, *fields):
+        return bool(self.get_dirty_fields(fields))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._snapshot_fields(None if update_fields is None else {
+            self._meta.get_field(name).attname for name in update_fields
+        })
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._snapshot_fields(None if fields is None else {
+            self._meta.get_field(name).attname for name in fields
+        })
@@ -5,10 +5,9 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from accounts.health_views import health_check
 from django.http import JsonResponse
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import HealthCheckView
+from .views import HealthCheckView, LivenessView, MetricsView, ReadinessView
 
 
 # Configure admin site
@@ -21,6 +20,8 @@ def home(request):
         'message': 'Welcome to the School Management System API',
         'endpoints': {
             'health_check': '/health/',
+            'liveness': '/livez',
+            'readiness': '/readyz',
             'admin': '/admin/',
             'api_docs': '/api/docs/',
             'auth': {
@@ -43,6 +44,8 @@ def home(request):
                 'by_class': '/api/students/class/{class_name}/',
                 'recent_admissions': '/api/students/recent-admissions/',
                 'bulk_update': '/api/students/bulk/update-status/',
+                'bulk_import': '/api/students/bulk/import/',
+                'export': '/api/students/export/',
                 'documents': '/api/students/{id}/documents/',
                 'notes': '/api/students/{id}/notes/'
             }
@@ -62,7 +65,10 @@ api_patterns = [
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home, name='home'),
-    path('health/', health_check, name='health_check'),
+    path('health/', HealthCheckView.as_view(), name='health_check'),
+    path('livez', LivenessView.as_view(), name='livez'),
+    path('readyz', ReadinessView.as_view(), name='readyz'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api/auth/', include('accounts.urls')),
     path('api/', include(api_patterns)),
 ]
@@ -1,61 +1,48 @@
 """
 Views for the core app.
 """
-import os
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views import View
-from django.conf import settings
-from django.db import connection
-import redis
 
-class HealthCheckView(View):
+from . import health, metrics
+
+
+class LivenessView(View):
+    """
+    Liveness probe: the process is up and serving requests. Never checks a
+    dependency, so an outage elsewhere does not get every node restarted.
+    """
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'status': 'ok'})
+
+
+class ReadinessView(View):
+    """
+    Readiness probe: the latest background probe results for the database
+    and cache, see ``core.health``. 503 when a dependency is down or its
+    result is stale. Monitoring requests get the full report with errors
+    and saturation indicators, everyone else the status and latencies.
+    """
+    def get(self, request, *args, **kwargs):
+        report = health.monitor.report()
+        status = 503 if report['status'] == 'error' else 200
+        if not health.is_monitoring_request(request):
+            report = health.public_report(report)
+        return JsonResponse(report, status=status)
+
+
+# The original /health/ endpoint now serves the readiness report
+HealthCheckView = ReadinessView
+
+
+class MetricsView(View):
     """
-    Health check endpoint for monitoring the service status.
+    Prometheus scrape endpoint, see ``core.metrics``. Only for monitoring
+    requests (``MONITORING_TOKEN`` as a bearer token, or a client in
+    ``MONITORING_ALLOWED_IPS``), since the backend port is published too.
     """
     def get(self, request, *args, **kwargs):
-        """
-        Check the health of the service and its dependencies.
-        """
-        # Default response
-        status = 200
-        checks = {
-            'database': self._check_database(),
-            'redis': self._check_redis(),
-        }
-
-        # If any check failed, set status to 503
-        if not all(checks.values()):
-            status = 503
-
-        return JsonResponse(
-            {
-                'status': 'ok' if status == 200 else 'error',
-                'checks': checks,
-            },
-            status=status
-        )
-
-    def _check_database(self):
-        """Check if the database is available."""
-        try:
-            connection.ensure_connection()
-            return True
-        except Exception:
-            return False
-
-    def _check_redis(self):
-        """Check if Redis is available."""
-        try:
-            redis_conn = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD,
-                socket_connect_timeout=1,
-                socket_keepalive=True,
-                retry_on_timeout=True
-            )
-            return redis_conn.ping()
-        except Exception as e:
-            print(f"Redis connection error: {str(e)}")
-            return False
+        if not health.is_monitoring_request(request):
+            return JsonResponse({'detail': 'Forbidden'}, status=403)
+        body, content_type = metrics.export()
+        return HttpResponse(body, content_type=content_type)
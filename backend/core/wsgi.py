@@ -8,3 +8,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Build the in-memory student autocomplete index before the first request
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'STUDENT_AUTOCOMPLETE_WARM_ON_STARTUP', False):
+    from students.autocomplete import warm_in_background
+    warm_in_background()
@@ -0,0 +1,32 @@
+"""
+gunicorn settings read from the working directory at start-up.
+
+The worker count is left to gunicorn (one worker, or ``WEB_CONCURRENCY``;
+``--workers`` and ``--threads`` on the command line also apply). Every
+worker is a process with its own database connections, autocomplete index
+and health probe thread, so adding workers is a capacity decision made where
+the server is deployed. The values in effect are exported to the workers,
+where ``core.hashing`` sizes the password hashing limit from them.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set, workers write their metrics there
+for ``/metrics`` to aggregate (see ``core.metrics``). The directory is
+emptied when the server starts, so counters from a previous run are not
+carried over, and samples of exited workers are cleaned up.
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    os.environ['WEB_CONCURRENCY'] = str(server.cfg.workers)
+    os.environ['GUNICORN_THREADS'] = str(server.cfg.threads)
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,8 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import Student, StudentDocument, StudentNote
+from .transitions import StatusTransition, NOT_ALLOWED, UPDATED
 
 
 class StudentDocumentInline(admin.TabularInline):
@@ -114,20 +115,28 @@ class StudentAdmin(admin.ModelAdmin):
         return "No Image"
     get_profile_picture.short_description = 'Profile Picture'
     
+    def apply_transition(self, request, queryset, new_status):
+        report = StatusTransition(new_status, updated_by=request.user).run_queryset(queryset)
+        summary = report['summary']
+        self.message_user(request, f"{summary.get(UPDATED, 0)} students marked as {new_status}.")
+        skipped = summary.get(NOT_ALLOWED, 0)
+        if skipped:
+            self.message_user(
+                request,
+                f'{skipped} students were skipped because they cannot move to {new_status}.',
+                level=messages.WARNING
+            )
+    
     def mark_as_active(self, request, queryset):
-        updated = queryset.update(status='active', enrollment_status=True)
-        self.message_user(request, f'{updated} students marked as active.')
+        self.apply_transition(request, queryset, 'active')
     mark_as_active.short_description = "Mark selected students as active"
     
     def mark_as_inactive(self, request, queryset):
-        updated = queryset.update(status='inactive', enrollment_status=False)
-        self.message_user(request, f'{updated} students marked as inactive.')
+        self.apply_transition(request, queryset, 'inactive')
     mark_as_inactive.short_description = "Mark selected students as inactive"
     
     def mark_as_graduated(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(status='graduated', graduation_date=timezone.now().date())
-        self.message_user(request, f'{updated} students marked as graduated.')
+        self.apply_transition(request, queryset, 'graduated')
     mark_as_graduated.short_description = "Mark selected students as graduated"
     
     def save_model(self, request, obj, form, change):
@@ -0,0 +1,102 @@
+"""
+Async versions of the hot student read endpoints.
+
+Same URLs, responses, caching and validators as their counterparts in
+``students.views``, but written with Django's async ORM and wrapped in
+``core.async_api.async_api_view``, so under an ASGI server a request waiting
+on the database or cache does not hold a worker thread. ``students.urls``
+routes to these when ``STUDENT_ASYNC_READ_VIEWS`` is on.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.async_api import async_api_view
+
+from . import conditional, counters, result_cache
+from .models import Student
+from .pagination import StudentPagination
+from .serializers import StudentStatsSerializer, get_sparse_fieldset
+from .views import admitted_since, class_roster, list_encoder, quick_info_data
+
+
+async def astudent_list_response(request, queryset, fieldset, paginator=None):
+    """``student_list_response()`` for async views"""
+    queryset, encode = list_encoder(queryset, fieldset)
+    if paginator is not None:
+        rows = await paginator.apaginate_queryset(queryset, request)
+        if rows is not None:
+            return paginator.get_paginated_response(encode(rows))
+    return Response(encode([row async for row in queryset]))
+
+
+@async_api_view()
+async def student_stats(request):
+    """
+    Get comprehensive student statistics
+    """
+    stats_data = await counters.aread_stats()
+
+    serializer = StudentStatsSerializer(stats_data)
+    return Response(serializer.data)
+
+
+@async_api_view()
+@conditional.aconditional_collection(lambda status_type: Student.objects.filter(status=status_type), namespace='by_status')
+@result_cache.acache_results('by_status')
+async def students_by_status(request, status_type):
+    """
+    Get students filtered by specific status
+    """
+    valid_statuses = dict(Student.STATUS_CHOICES).keys()
+    if status_type not in valid_statuses:
+        return Response(
+            {'error': f'Invalid status. Valid options: {list(valid_statuses)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    students = Student.objects.filter(status=status_type)
+    return await astudent_list_response(
+        request, students, get_sparse_fieldset(request), paginator=StudentPagination()
+    )
+
+
+@async_api_view()
+@conditional.aconditional_collection(class_roster, namespace='by_class')
+@result_cache.acache_results('by_class')
+async def students_by_class(request, class_name):
+    """
+    Get students in a specific class
+    """
+    return await astudent_list_response(
+        request, class_roster(class_name), get_sparse_fieldset(request), paginator=StudentPagination()
+    )
+
+
+@async_api_view()
+@conditional.aconditional_collection(lambda: admitted_since(timezone.now() - timedelta(days=30)))
+async def recent_admissions(request):
+    """
+    Get recently admitted students (last 30 days)
+    """
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+    recent_students = admitted_since(thirty_days_ago).order_by('-admission_date')
+
+    return await astudent_list_response(request, recent_students, get_sparse_fieldset(request))
+
+
+@async_api_view()
+async def student_quick_info(request, student_id):
+    """
+    Get quick student information for popups/tooltips
+    """
+    try:
+        student = await Student.objects.aget(student_id=student_id)
+        return Response(quick_info_data(student))
+    except Student.DoesNotExist:
+        return Response(
+            {'error': 'Student not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
@@ -0,0 +1,363 @@
+"""
+In-process prefix index for the student autocomplete endpoint.
+
+The index keeps a sorted array of normalised keys (first name, last name,
+full name and student ID) next to a parallel array of student primary keys,
+so a lookup is a binary search plus a short forward scan. It is built from a
+values-only query and updated incrementally by the ``Student`` signals in
+this process.
+
+Changes reach the other processes through the shared cache: every change
+bumps a generation counter and stores the primary keys it touched under the
+new generation. A process that falls behind re-reads just those students
+(one ``pk IN`` query) when it next syncs. Only when the changes cannot be
+replayed (a record expired, or a bulk write too large to list) does it
+rebuild, on a background thread, and it keeps answering from its current
+index until the new one is ready.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.db import connection
+
+from .models import Student
+
+GENERATION_CACHE_KEY = 'students:autocomplete:generation'
+CHANGES_CACHE_KEY = 'students:autocomplete:changes:{generation}'
+
+# Seconds a change record is kept for processes that are behind
+CHANGES_TIMEOUT = 60 * 60
+
+# Writes touching more students than this ask for a rebuild instead
+MAX_CHANGED_PKS = 1000
+# Processes further behind than this many changes rebuild
+MAX_REPLAYED_GENERATIONS = 500
+
+# Change record asking every process to rebuild
+REBUILD = 'rebuild'
+
+# How often (seconds) a process checks the shared generation counter
+SYNC_INTERVAL = 5
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+VALUE_FIELDS = [
+    'id', 'student_id', 'first_name', 'middle_name', 'last_name',
+    'current_class', 'status',
+]
+
+
+def normalise(value):
+    return ' '.join((value or '').lower().split())
+
+
+def full_name(first_name, middle_name, last_name):
+    if middle_name:
+        return f"{first_name} {middle_name} {last_name}"
+    return f"{first_name} {last_name}"
+
+
+class StudentPrefixIndex:
+    """Sorted-array prefix index over student names and IDs"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []
+        self._pks = []
+        self._entries = {}
+        self._indexed_keys = {}
+        self._generation = None
+        self._last_sync = 0.0
+        self._missing_generation = None
+        self._rebuild_thread = None
+        self.stats = {
+            'rebuilds': 0,
+            'last_rebuild_seconds': None,
+            'lookups': 0,
+            'incremental_updates': 0,
+            'replayed_changes': 0,
+        }
+
+    @property
+    def is_warm(self):
+        return self._generation is not None
+
+    # Building -----------------------------------------------------------
+
+    @staticmethod
+    def keys_for(row):
+        first_name = normalise(row['first_name'])
+        last_name = normalise(row['last_name'])
+        keys = {
+            first_name,
+            last_name,
+            f'{first_name} {last_name}',
+            normalise(row['student_id']),
+        }
+        keys.discard('')
+        return keys
+
+    @staticmethod
+    def entry_for(row):
+        return (
+            str(row['id']),
+            row['student_id'],
+            full_name(row['first_name'], row['middle_name'], row['last_name']),
+            row['current_class'],
+            row['status'],
+        )
+
+    def rebuild(self):
+        """Replace the index contents from a single values-only query"""
+        started = time.perf_counter()
+        generation = get_generation() or 0
+        pairs, entries, indexed_keys = [], {}, {}
+        for row in Student.objects.order_by().values(*VALUE_FIELDS).iterator(chunk_size=5000):
+            keys = self.keys_for(row)
+            entries[row['id']] = self.entry_for(row)
+            indexed_keys[row['id']] = keys
+            pairs.extend((key, row['id']) for key in keys)
+        pairs.sort()
+
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._pks = [pk for _, pk in pairs]
+            self._entries = entries
+            self._indexed_keys = indexed_keys
+            self._generation = generation
+            self._last_sync = time.monotonic()
+            self._missing_generation = None
+            self.stats['rebuilds'] += 1
+            self.stats['last_rebuild_seconds'] = time.perf_counter() - started
+
+    def sync(self):
+        """Build on first use and catch up with changes made by other processes"""
+        if not self.is_warm:
+            self.rebuild()
+            return
+        now = time.monotonic()
+        if now - self._last_sync < SYNC_INTERVAL:
+            return
+        self._last_sync = now
+        generation, current = self._generation, get_generation()
+        if current is None or current == generation:
+            return
+        if current < generation or current - generation > MAX_REPLAYED_GENERATIONS:
+            # The counter was reset or this process is far behind
+            self.rebuild_in_background()
+            return
+
+        records = cache.get_many([
+            CHANGES_CACHE_KEY.format(generation=number) for number in range(generation + 1, current + 1)
+        ])
+        pks, replayed_to = set(), generation
+        for number in range(generation + 1, current + 1):
+            changed = records.get(CHANGES_CACHE_KEY.format(generation=number))
+            if changed == REBUILD:
+                self.rebuild_in_background()
+                return
+            if changed is None:
+                if number == self._missing_generation:
+                    # Still missing a sync later, so it expired: start over
+                    self.rebuild_in_background()
+                    return
+                # The writer may not have stored it yet, look again next sync
+                self._missing_generation = number
+                break
+            pks.update(changed)
+            replayed_to = number
+        if replayed_to > generation:
+            self.replay(pks, generation, replayed_to)
+
+    def replay(self, pks, generation, replayed_to):
+        """Re-read the students changed between two generations"""
+        rows = {
+            row['id']: row for row in
+            Student.objects.filter(pk__in=pks).values(*VALUE_FIELDS)
+        } if pks else {}
+        with self._lock:
+            if self._generation != generation:
+                # Rebuilt or replayed concurrently
+                return
+            for pk in pks:
+                if pk in rows:
+                    self._insert_locked(rows[pk])
+                else:
+                    self._remove_locked(pk)
+            self._generation = replayed_to
+            self._missing_generation = None
+            self.stats['replayed_changes'] += len(pks)
+
+    def rebuild_in_background(self):
+        """Rebuild on a daemon thread unless one is running; lookups use the current index meanwhile"""
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild_and_close, name='student-autocomplete-rebuild', daemon=True
+            )
+            self._rebuild_thread.start()
+
+    def _rebuild_and_close(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # The next sync tries again
+            pass
+        finally:
+            connection.close()
+
+    # Incremental maintenance ----------------------------------------------
+
+    def _remove_locked(self, pk):
+        self._entries.pop(pk, None)
+        for key in self._indexed_keys.pop(pk, ()):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._pks[position] == pk:
+                    del self._keys[position]
+                    del self._pks[position]
+                    break
+                position += 1
+
+    def _insert_locked(self, row):
+        self._remove_locked(row['id'])
+        keys = self.keys_for(row)
+        for key in keys:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._pks.insert(position, row['id'])
+        self._entries[row['id']] = self.entry_for(row)
+        self._indexed_keys[row['id']] = keys
+
+    def upsert(self, row):
+        """Insert or replace one student, given a dict with ``VALUE_FIELDS``"""
+        with self._lock:
+            if self.is_warm:
+                self._insert_locked(row)
+                self.stats['incremental_updates'] += 1
+            self._publish_locked(row['id'])
+
+    def remove(self, pk):
+        with self._lock:
+            if self.is_warm:
+                self._remove_locked(pk)
+                self.stats['incremental_updates'] += 1
+            self._publish_locked(pk)
+
+    def _publish_locked(self, pk):
+        """
+        Publish a local change. If nobody else published one in the meantime
+        this process is still current and keeps its index.
+        """
+        generation = mark_changed([pk])
+        if self.is_warm and generation == self._generation + 1:
+            self._generation = generation
+
+    # Queries --------------------------------------------------------------
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        prefix = normalise(query)
+        if not prefix:
+            return []
+        self.sync()
+        results, seen = [], set()
+        with self._lock:
+            self.stats['lookups'] += 1
+            keys, pks = self._keys, self._pks
+            position = bisect_left(keys, prefix)
+            while position < len(keys) and len(results) < limit:
+                if not keys[position].startswith(prefix):
+                    break
+                pk = pks[position]
+                if pk not in seen:
+                    seen.add(pk)
+                    results.append(self._entries[pk])
+                position += 1
+        return [
+            {
+                'id': pk,
+                'student_id': student_id,
+                'full_name': name,
+                'current_class': current_class,
+                'status': status,
+            }
+            for pk, student_id, name, current_class, status in results
+        ]
+
+    def metrics(self):
+        with self._lock:
+            memory = (
+                sys.getsizeof(self._keys) + sys.getsizeof(self._pks)
+                + sys.getsizeof(self._entries) + sys.getsizeof(self._indexed_keys)
+                + sum(sys.getsizeof(key) for key in self._keys)
+                + sum(sys.getsizeof(pk) for pk in self._entries)
+                + sum(
+                    sys.getsizeof(entry) + sum(sys.getsizeof(value) for value in entry)
+                    for entry in self._entries.values()
+                )
+                + sum(sys.getsizeof(keys) for keys in self._indexed_keys.values())
+            )
+            return {
+                'students': len(self._entries),
+                'keys': len(self._keys),
+                'memory_bytes': memory,
+                'warm': self.is_warm,
+                **self.stats,
+            }
+
+
+def new_generation():
+    """
+    Seed for a missing counter. Time based, so it is never below a
+    generation a process already saw.
+    """
+    return time.time_ns() // 1000
+
+
+def get_generation():
+    """The shared generation, seeding it if missing; None if the cache is unreachable"""
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, new_generation(), None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def mark_changed(pks=None):
+    """
+    Tell every process that the students with primary keys ``pks`` changed,
+    e.g. after writes that bypass the model signals. Without ``pks``, or with
+    more than ``MAX_CHANGED_PKS``, the other processes rebuild their index
+    in the background. Returns the new generation.
+    """
+    try:
+        generation = cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        generation = new_generation()
+        cache.set(GENERATION_CACHE_KEY, generation, None)
+    pks = list(pks) if pks is not None else []
+    record = pks if 0 < len(pks) <= MAX_CHANGED_PKS else REBUILD
+    cache.set(CHANGES_CACHE_KEY.format(generation=generation), record, CHANGES_TIMEOUT)
+    return generation
+
+
+index = StudentPrefixIndex()
+
+
+def warm_in_background():
+    """Build the index off the request path, e.g. at server start-up"""
+    def warm():
+        try:
+            index.sync()
+        except Exception:
+            # The first request will retry; never break start-up over this
+            pass
+        finally:
+            connection.close()
+
+    threading.Thread(target=warm, name='student-autocomplete-warmup', daemon=True).start()
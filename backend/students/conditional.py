@@ -0,0 +1,139 @@
+"""
+Conditional GET support (ETag / Last-Modified) for student endpoints.
+
+Validators are computed from ``Student.updated_at`` before any serialization
+happens, so a client revalidating an unchanged resource gets a 304 for the
+price of one narrow query. Collections use a ``max(updated_at)`` and
+``count`` fingerprint of the filtered queryset: the maximum moves when a row
+is added or changed and the count moves when one is removed. Collections
+served through the result cache (``students.result_cache``) skip even that
+query and use the namespace's generation, which every write that can change
+a cached list bumps. The ``a`` prefixed functions are the async view
+versions.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import result_cache
+
+
+def make_etag(request, *parts):
+    """
+    Weak ETag over ``parts`` and the negotiated format, since the JSON and
+    browsable renderings of one resource differ.
+    """
+    fmt = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    digest = hashlib.md5('|'.join(str(part) for part in (fmt, *parts)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def collection_etag(request, queryset):
+    fingerprint = queryset.order_by().aggregate(last_updated=Max('updated_at'), total=Count('pk'))
+    last_updated = fingerprint['last_updated']
+    return make_etag(
+        request, fingerprint['total'], last_updated.isoformat() if last_updated else ''
+    )
+
+
+async def acollection_etag(request, queryset):
+    fingerprint = await queryset.order_by().aaggregate(last_updated=Max('updated_at'), total=Count('pk'))
+    last_updated = fingerprint['last_updated']
+    return make_etag(
+        request, fingerprint['total'], last_updated.isoformat() if last_updated else ''
+    )
+
+
+def results_etag(request, namespace, queryset):
+    """
+    ETag for a collection cached under ``namespace``: its result cache
+    generation, or the ``queryset`` fingerprint if the cache is unreachable
+    """
+    generation = result_cache.get_generation(namespace)
+    if generation is None:
+        return collection_etag(request, queryset)
+    return make_etag(request, namespace, generation, result_cache.request_digest(request))
+
+
+async def aresults_etag(request, namespace, queryset):
+    generation = await result_cache.aget_generation(namespace)
+    if generation is None:
+        return await acollection_etag(request, queryset)
+    return make_etag(request, namespace, generation, result_cache.request_digest(request))
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_response(request, etag, build, last_modified=None):
+    """
+    Answer 304 when the client's ``If-None-Match``/``If-Modified-Since``
+    still match, otherwise return ``build()`` with the validators attached.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+
+    response = build()
+    if response.status_code == 200:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+async def aconditional_response(request, etag, build, last_modified=None):
+    """``conditional_response()`` for async views; ``build`` is a coroutine function"""
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+
+    response = await build()
+    if response.status_code == 200:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_collection(get_queryset, namespace=None):
+    """
+    Decorator for list-style function views, applied beneath ``@api_view``.
+    ``get_queryset`` receives the view's URL arguments and must return the
+    same filtered queryset the view lists. Views cached by the result cache
+    pass its ``namespace`` to be validated by generation instead.
+
+    Only an ETag is sent: ``max(updated_at)`` alone cannot tell that a row
+    left the collection, so ``If-Modified-Since`` is not honoured here.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            queryset = get_queryset(*args, **kwargs)
+            if namespace is None:
+                etag = collection_etag(request, queryset)
+            else:
+                etag = results_etag(request, namespace, queryset)
+            return conditional_response(request, etag, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def aconditional_collection(get_queryset, namespace=None):
+    """``conditional_collection()`` for async views, applied beneath ``@async_api_view``"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            queryset = get_queryset(*args, **kwargs)
+            if namespace is None:
+                etag = await acollection_etag(request, queryset)
+            else:
+                etag = await aresults_etag(request, namespace, queryset)
+            return await aconditional_response(request, etag, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
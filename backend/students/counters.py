@@ -0,0 +1,230 @@
+"""
+Incrementally maintained enrollment counters.
+
+``StudentCounter`` rows hold the number of students per status, class,
+gender, admission month and date of birth, plus overall and active totals.
+Every write path adjusts them in the same transaction as the student rows:
+``Student`` saves and deletes through the signals in ``students.signals``,
+queryset updates through ``counted_update()`` and bulk inserts through
+``record_created()``. ``read_stats()`` (``aread_stats()`` in async views)
+then answers the dashboard from a handful of counter rows instead of
+scanning ``students_student``.
+
+``reconcile_student_counters`` rebuilds the table from scratch and reports
+any drift.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Student, StudentCounter
+from .stats import AGE_BANDS, OVERFLOW_BAND, years_before
+
+# Student fields the counters depend on
+COUNTED_FIELDS = [
+    'status', 'current_class', 'gender', 'admission_date', 'date_of_birth',
+    'enrollment_status',
+]
+
+TOTAL = ('total', '')
+ACTIVE = ('active', '')
+
+
+def counter_keys(row):
+    """Counter keys a student contributes to, given a dict of ``COUNTED_FIELDS``"""
+    keys = [
+        TOTAL,
+        ('status', row['status']),
+        ('class', row['current_class']),
+        ('gender', row['gender']),
+    ]
+    # str() covers dates and the datetime default of ``admission_date``
+    if row['admission_date'] is not None:
+        keys.append(('admission_month', str(row['admission_date'])[:7]))
+    if row['date_of_birth'] is not None:
+        keys.append(('birth_date', str(row['date_of_birth'])[:10]))
+    if row['status'] == 'active' and row['enrollment_status']:
+        keys.append(ACTIVE)
+    return keys
+
+
+def snapshot(instance):
+    return {field: getattr(instance, field) for field in COUNTED_FIELDS}
+
+
+def delta(before=None, after=None, count=1):
+    """Counter changes for one student (or ``count`` identical ones) going from ``before`` to ``after``"""
+    changes = Counter()
+    if before is not None:
+        for key in counter_keys(before):
+            changes[key] -= count
+    if after is not None:
+        for key in counter_keys(after):
+            changes[key] += count
+    return changes
+
+
+def record_created(students):
+    """Count students inserted with ``bulk_create`` (which skips signals)"""
+    changes = Counter()
+    for student in students:
+        changes.update(delta(after=snapshot(student)))
+    StudentCounter.apply(changes)
+
+
+def counted_update(queryset, previous=None, **changes):
+    """
+    ``queryset.update(**changes)`` that keeps the counters in step.
+
+    The affected rows are locked and their counted fields read first, so the
+    adjustment is exact even with concurrent writers. A caller that already
+    holds the locks passes the rows' counted fields (dicts) as ``previous``
+    instead.
+    """
+    with transaction.atomic():
+        if not set(changes) & set(COUNTED_FIELDS):
+            return queryset.update(**changes)
+        if previous is None:
+            groups = Counter(
+                tuple(row) for row in
+                queryset.select_for_update().values_list(*COUNTED_FIELDS).iterator()
+            )
+        else:
+            groups = Counter(tuple(row[field] for field in COUNTED_FIELDS) for row in previous)
+        updated = queryset.update(**changes)
+        adjustments = Counter()
+        for values, count in groups.items():
+            before = dict(zip(COUNTED_FIELDS, values))
+            after = {**before, **{
+                field: value for field, value in changes.items() if field in COUNTED_FIELDS
+            }}
+            adjustments.update(delta(before, after, count))
+        StudentCounter.apply(adjustments)
+    return updated
+
+
+def count_students(queryset):
+    """Compute every counter from scratch with a few grouped queries"""
+    queryset = queryset.order_by()
+    counts = Counter()
+    for dimension, field in [('status', 'status'), ('class', 'current_class'), ('gender', 'gender')]:
+        for row in queryset.values(field).annotate(n=Count('pk')):
+            counts[(dimension, row[field])] += row['n']
+    for row in queryset.values('admission_date').annotate(n=Count('pk')):
+        if row['admission_date'] is not None:
+            counts[('admission_month', str(row['admission_date'])[:7])] += row['n']
+    for row in queryset.values('date_of_birth').annotate(n=Count('pk')):
+        if row['date_of_birth'] is not None:
+            counts[('birth_date', str(row['date_of_birth'])[:10])] += row['n']
+    counts[TOTAL] = queryset.count()
+    counts[ACTIVE] = queryset.filter(status='active', enrollment_status=True).count()
+    return +counts
+
+
+def stored_counts():
+    return Counter({
+        (dimension, value): count
+        for dimension, value, count in StudentCounter.objects.exclude(count=0).values_list(
+            'dimension', 'value', 'count'
+        )
+    })
+
+
+def rebuild(dry_run=False):
+    """
+    Replace the counters with freshly computed values and return the drift
+    as ``{(dimension, value): (stored, actual)}``. ``dry_run`` only reports.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Block counter writers so no change lands between counting and storing
+            table = connection.ops.quote_name(StudentCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {table} IN EXCLUSIVE MODE')
+        actual = count_students(Student.objects.all())
+        stored = stored_counts()
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(stored) | set(actual)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        if dry_run:
+            return drift
+        StudentCounter.objects.all().delete()
+        StudentCounter.objects.bulk_create(
+            StudentCounter(dimension=dimension, value=value, count=count)
+            for (dimension, value), count in actual.items()
+        )
+    return drift
+
+
+def read_stats(today=None):
+    """Same result as ``compute_student_stats()``, read from the counters"""
+    today = today or timezone.localdate()
+    rows = list(dimension_counts())
+    return assemble_stats(rows, date_counts().aggregate(**date_sums(today)))
+
+
+async def aread_stats(today=None):
+    """``read_stats()`` for async views"""
+    today = today or timezone.localdate()
+    rows = [row async for row in dimension_counts()]
+    return assemble_stats(rows, await date_counts().aaggregate(**date_sums(today)))
+
+
+def dimension_counts():
+    return StudentCounter.objects.filter(
+        dimension__in=['total', 'active', 'status', 'class', 'gender']
+    ).exclude(count=0).values_list('dimension', 'value', 'count')
+
+
+def date_counts():
+    return StudentCounter.objects.filter(dimension__in=['admission_month', 'birth_date'])
+
+
+def date_sums(today):
+    """Admissions and ages come from range sums over the date counters"""
+    month = today.strftime('%Y-%m')
+    return {
+        'new_admissions': Sum('count', filter=Q(dimension='admission_month', value__gte=month)),
+        **{
+            f'band_{index}': Sum('count', filter=Q(
+                dimension='birth_date',
+                value__lte=years_before(today, low).isoformat(),
+                value__gt=years_before(today, high + 1).isoformat(),
+            ))
+            for index, (_, low, high) in enumerate(AGE_BANDS)
+        },
+    }
+
+
+def assemble_stats(rows, aggregates):
+    by_dimension = {'status': {}, 'class': {}, 'gender': {}}
+    totals = {TOTAL: 0, ACTIVE: 0}
+    for dimension, value, count in rows:
+        if (dimension, value) in totals:
+            totals[(dimension, value)] = count
+        else:
+            by_dimension[dimension][value] = count
+
+    total = totals[TOTAL]
+    age_distribution = {
+        label: aggregates[f'band_{index}'] or 0
+        for index, (label, _, _) in enumerate(AGE_BANDS)
+    }
+    age_distribution[OVERFLOW_BAND] = total - sum(age_distribution.values())
+
+    by_status = by_dimension['status']
+    return {
+        'total_students': total,
+        'active_students': totals[ACTIVE],
+        'inactive_students': by_status.get('inactive', 0),
+        'graduated_students': by_status.get('graduated', 0),
+        'new_admissions_this_month': aggregates['new_admissions'] or 0,
+        'students_by_class': by_dimension['class'],
+        'students_by_status': by_status,
+        'gender_distribution': by_dimension['gender'],
+        'age_distribution': age_distribution,
+    }
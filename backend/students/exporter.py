@@ -0,0 +1,57 @@
+"""
+Streaming student exports.
+
+Rows are read from a server-side cursor with ``values_list().iterator()`` and
+encoded one at a time, so memory use does not grow with the export size.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Student
+
+EXPORT_CHUNK_SIZE = 2000
+
+# export_format -> (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Concrete columns in model order; foreign keys export their raw id
+EXPORT_COLUMNS = [
+    field.attname for field in Student._meta.concrete_fields
+    if field.name != 'search_vector'
+]
+
+
+def parse_export_columns(value):
+    """Validate a comma separated column list, defaulting to every column"""
+    if not value:
+        return list(EXPORT_COLUMNS)
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    invalid = [column for column in columns if column not in EXPORT_COLUMNS]
+    if invalid:
+        raise ValueError(f'Invalid columns: {invalid}. Valid options: {EXPORT_COLUMNS}')
+    return columns
+
+
+class Echo:
+    """File-like object whose write() returns the value for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(rows, columns, export_format):
+    """Yield encoded lines for ``rows`` (tuples ordered like ``columns``)"""
+    if export_format == 'ndjson':
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+        for row in rows:
+            yield encoder.encode(dict(zip(columns, row))) + '\n'
+        return
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,250 @@
+"""
+Bulk student import from CSV or XLSX files.
+
+Rows are parsed lazily and handled in batches: each batch is validated with a
+single reused serializer, checked for duplicate emails and student IDs with
+one set-based query per table, and inserted with ``bulk_create`` together
+with the linked user accounts and profiles. Emails are compared without
+regard to case. A batch that still hits a constraint (a concurrent import of
+the same rows) is retried row by row, so only the clashing rows fail.
+"""
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from accounts.models import Profile
+from . import autocomplete, counters, result_cache
+from .models import Student
+from .serializers import StudentImportSerializer
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportFormatError(Exception):
+    """Raised when an uploaded file cannot be read as CSV or XLSX"""
+
+
+def iter_csv_rows(fileobj):
+    """Yield one dict per CSV data row, decoding the byte stream lazily"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(f'The file is not UTF-8 encoded CSV: {exc}') from exc
+    except csv.Error as exc:
+        raise ImportFormatError(f'The file is not valid CSV: {exc}') from exc
+    finally:
+        text.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    """Yield one dict per worksheet row using openpyxl's read-only mode"""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError as exc:
+        raise ImportFormatError('XLSX import requires the openpyxl package') from exc
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        raise ImportFormatError(f'The file is not a valid XLSX workbook: {exc}') from exc
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        for values in rows:
+            yield {
+                column: value.date() if isinstance(value, datetime) else value
+                for column, value in zip(header, values)
+                if column
+            }
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """Pick a row reader from the file extension"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('', '.csv'):
+        return iter_csv_rows(fileobj)
+    if extension in ('.xlsx', '.xlsm'):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError(f'Unsupported file type: {extension}')
+
+
+def clean_row(row):
+    """Strip whitespace and drop empty cells so model defaults apply"""
+    cleaned = {}
+    for key, value in row.items():
+        if not key or value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        cleaned[key.strip()] = value
+    return cleaned
+
+
+class StudentImporter:
+    """
+    Validate and insert students from an iterable of row dicts.
+
+    ``run()`` returns a report with the number of rows processed, created and
+    failed, plus a list of per-row errors keyed by the row's line number.
+    With ``dry_run`` nothing is written and ``created`` counts the rows that
+    passed validation. Batches are committed as they go, so after an
+    ``ImportFormatError`` partway through the file ``report`` still tells
+    what was imported.
+    """
+
+    def __init__(self, created_by=None, batch_size=DEFAULT_BATCH_SIZE,
+                 dry_run=False, first_row_number=2):
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.first_row_number = first_row_number
+        self.serializer = StudentImportSerializer()
+        self.seen_emails = set()
+        self.seen_student_ids = set()
+        self.report = {'total_rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+
+    def run(self, rows):
+        numbered = enumerate(rows, start=self.first_row_number)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                return self.report
+            self.process_batch(batch)
+
+    def process_batch(self, batch):
+        self.report['total_rows'] += len(batch)
+        valid = []
+        for row_number, row in batch:
+            try:
+                valid.append((row_number, self.serializer.run_validation(clean_row(row))))
+            except serializers.ValidationError as exc:
+                self.add_error(row_number, exc.detail)
+
+        valid = self.check_uniqueness(valid)
+        if valid and not self.dry_run:
+            valid = self.insert_or_report(valid)
+        self.report['created'] += len(valid)
+
+    def check_uniqueness(self, rows):
+        """Reject rows whose email or student_id clashes with the database or the file"""
+        emails = {data['email'].lower() for _, data in rows if data.get('email')}
+        student_ids = {data['student_id'] for _, data in rows if data.get('student_id')}
+        taken_emails = set()
+        if emails:
+            # The columns are unique as stored, so compare both sides lowercased
+            for model in (Student, User):
+                taken_emails.update(
+                    model.objects.annotate(email_lower=Lower('email'))
+                    .filter(email_lower__in=emails).values_list('email_lower', flat=True)
+                )
+        taken_ids = set(
+            Student.objects.filter(student_id__in=student_ids).values_list('student_id', flat=True)
+        ) if student_ids else set()
+
+        unique = []
+        for row_number, data in rows:
+            errors = {}
+            email = (data.get('email') or '').lower()
+            if email and (email in taken_emails or email in self.seen_emails):
+                errors['email'] = ['A student with this email already exists.']
+            student_id = data.get('student_id')
+            if student_id and (student_id in taken_ids or student_id in self.seen_student_ids):
+                errors['student_id'] = ['A student with this ID already exists.']
+            if errors:
+                self.add_error(row_number, errors)
+                continue
+            if email:
+                self.seen_emails.add(email)
+            if student_id:
+                self.seen_student_ids.add(student_id)
+            unique.append((row_number, data))
+        return unique
+
+    def insert_or_report(self, rows):
+        """
+        Insert ``rows`` and return the ones that were created. On a
+        constraint violation the batch is rolled back and retried row by row,
+        and each row that still fails is reported.
+        """
+        try:
+            self.insert(rows)
+            return rows
+        except IntegrityError:
+            pass
+        created = []
+        for row_number, data in rows:
+            try:
+                self.insert([(row_number, data)])
+            except IntegrityError as exc:
+                self.seen_emails.discard((data.get('email') or '').lower())
+                self.seen_student_ids.discard(data.get('student_id'))
+                self.add_error(row_number, {'non_field_errors': [f'Could not be saved: {exc}']})
+            else:
+                created.append((row_number, data))
+        return created
+
+    def insert(self, rows):
+        students = [
+            Student(created_by=self.created_by, **data) for _, data in rows
+        ]
+        missing_ids = [student for student in students if not student.student_id]
+        with transaction.atomic():
+            if missing_ids:
+                for student, student_id in zip(
+                    missing_ids, Student.allocate_student_ids(len(missing_ids))
+                ):
+                    student.student_id = student_id
+            self.create_user_accounts(students)
+            Student.objects.bulk_create(students, batch_size=self.batch_size)
+            # bulk_create skips the signals that keep the enrollment counters,
+            # autocomplete index and result cache current
+            counters.record_created(students)
+            transaction.on_commit(lambda: autocomplete.mark_changed([student.pk for student in students]))
+            transaction.on_commit(result_cache.invalidate)
+
+    def create_user_accounts(self, students):
+        """Bulk create the accounts the post_save signal would create one by one"""
+        with_email = [student for student in students if student.email]
+        if not with_email:
+            return
+        # Accounts are created without a usable password, as in the signal
+        password = make_password(None)
+        users = User.objects.bulk_create([
+            User(
+                email=User.objects.normalize_email(student.email),
+                first_name=student.first_name,
+                last_name=student.last_name,
+                user_type='STUDENT',
+                is_active=True,
+                password=password,
+            )
+            for student in with_email
+        ], batch_size=self.batch_size)
+        Profile.objects.bulk_create(
+            [Profile(user=user) for user in users], batch_size=self.batch_size
+        )
+        for student, user in zip(with_email, users):
+            student.user = user
+
+    def add_error(self, row_number, detail):
+        self.report['failed'] += 1
+        self.report['errors'].append({'row': row_number, 'errors': detail})
@@ -0,0 +1 @@
+# This file makes the commands directory a Python package
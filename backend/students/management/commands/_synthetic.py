@@ -0,0 +1,57 @@
+"""
+Helpers for generating synthetic students in benchmark commands.
+
+Files prefixed with an underscore are not picked up as management commands.
+"""
+import random
+from datetime import date, timedelta
+
+from students.models import Student
+
+FIRST_NAMES = [
+    'Emma', 'Oliver', 'Amelia', 'George', 'Isla', 'Noah', 'Ava', 'Arthur',
+    'Mia', 'Leo', 'Grace', 'Oscar', 'Freya', 'Harry', 'Lily', 'Jack',
+]
+LAST_NAMES = [
+    'Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson', 'Johnson',
+    'Davies', 'Patel', 'Robinson', 'Wright', 'Thompson', 'Evans', 'Walker',
+]
+CLASSES = [f'Year {year}' for year in range(1, 14)]
+STATUSES = [choice for choice, _ in Student.STATUS_CHOICES]
+GENDERS = [choice for choice, _ in Student.GENDER_CHOICES]
+
+
+class Rollback(Exception):
+    """Raised inside transaction.atomic() to discard synthetic rows"""
+
+
+def build_students(count, prefix='BENCH', seed=0):
+    """Yield unsaved ``Student`` instances with unique ``student_id`` values"""
+    rng = random.Random(seed)
+    today = date.today()
+    for number in range(count):
+        yield Student(
+            student_id=f'{prefix}{number:08d}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            date_of_birth=today - timedelta(days=rng.randint(3 * 365, 19 * 365)),
+            gender=rng.choice(GENDERS),
+            emergency_contact_name='Benchmark Contact',
+            emergency_contact_phone='+447000000000',
+            emergency_contact_relationship='Parent',
+            address_line_1='1 Benchmark Road',
+            city='London',
+            county='Greater London',
+            postal_code='N1 1AA',
+            admission_date=today - timedelta(days=rng.randint(0, 5 * 365)),
+            current_class=rng.choice(CLASSES),
+            academic_year='2024-2025',
+            status=rng.choice(STATUSES),
+        )
+
+
+def create_students(count, prefix='BENCH', batch_size=2000, seed=0):
+    """Bulk insert ``count`` synthetic students (bypasses save() and signals)"""
+    Student.objects.bulk_create(
+        build_students(count, prefix=prefix, seed=seed), batch_size=batch_size
+    )
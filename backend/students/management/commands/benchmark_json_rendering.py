@@ -0,0 +1,103 @@
+"""
+Benchmark DRF's ``JSONRenderer``/``JSONParser`` against the orjson pair in
+``core.renderers``/``core.parsers`` on large student payloads.
+
+Payloads are a page of ``StudentListSerializer`` data, a batch of
+``StudentDetailSerializer`` data (with notes) and raw ``values()`` rows, which
+still hold ``UUID``/``date``/``datetime`` objects. Synthetic rows are inserted
+inside a transaction that is rolled back.
+"""
+import io
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from students.models import Student, StudentNote
+from students.serializers import StudentDetailSerializer, StudentListSerializer
+from ._synthetic import Rollback, create_students
+
+IMPLEMENTATIONS = [
+    ('json', JSONRenderer(), JSONParser()),
+    ('orjson', ORJSONRenderer(), ORJSONParser()),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare render/parse time and peak memory of the JSON and orjson renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Students in the list payloads')
+        parser.add_argument('--details', type=int, default=500, help='Students in the detail payload')
+        parser.add_argument('--notes', type=int, default=3, help='Notes per detail student')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                create_students(options['rows'], prefix='JSON')
+                payloads = self._build_payloads(options['details'], options['notes'])
+                self.stdout.write(
+                    f"{'payload':>10} {'impl':>8} {'KiB':>9} {'render ms':>10} "
+                    f"{'parse ms':>9} {'peak KiB':>9}"
+                )
+                for name, data in payloads:
+                    self._measure(name, data, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _build_payloads(self, details, notes):
+        students = Student.objects.order_by('first_name', 'last_name', 'id')
+        detail_students = list(students[:details])
+        StudentNote.objects.bulk_create(
+            StudentNote(
+                student=student, note_type='academic', title=f'Note {number}',
+                content='Benchmark note content. ' * 10,
+            )
+            for student in detail_students for number in range(notes)
+        )
+        return [
+            ('list', StudentListSerializer(students, many=True).data),
+            ('detail', StudentDetailSerializer(
+                students.prefetch_related('documents', 'student_notes')[:details], many=True
+            ).data),
+            ('values', list(students.values(
+                'id', 'student_id', 'first_name', 'last_name', 'date_of_birth',
+                'admission_date', 'status', 'created_at', 'updated_at',
+            ))),
+        ]
+
+    def _measure(self, name, data, repeat):
+        parsed = {}
+        for label, renderer, parser in IMPLEMENTATIONS:
+            rendered = renderer.render(data)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                renderer.render(data)
+            render_time = (time.perf_counter() - started) / repeat
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                parsed[label] = parser.parse(io.BytesIO(rendered))
+            parse_time = (time.perf_counter() - started) / repeat
+
+            tracemalloc.start()
+            renderer.render(data)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f'{name:>10} {label:>8} {len(rendered) / 1024:>9.0f} {render_time * 1000:>10.2f} '
+                f'{parse_time * 1000:>9.2f} {peak / 1024:>9.0f}'
+            )
+
+        # Microseconds are truncated to milliseconds by DRF's encoder only
+        if name != 'values' and parsed['json'] != parsed['orjson']:
+            raise CommandError(f'Rendered {name} payloads differ between implementations')
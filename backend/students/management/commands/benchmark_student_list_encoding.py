@@ -0,0 +1,75 @@
+"""
+Benchmark the student list read path: ``StudentListSerializer`` over model
+instances versus ``StudentListEncoder`` over ``values_list`` rows.
+
+Both paths are timed end to end (query, row building and JSON rendering) on
+a page of synthetic students, and their rendered output is compared byte for
+byte. Rows are inserted inside a transaction that is rolled back.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from students.models import Student
+from students.rows import StudentListEncoder
+from students.serializers import StudentListSerializer
+from ._synthetic import Rollback, create_students
+
+
+class Command(BaseCommand):
+    help = 'Compare serializer and row-encoder throughput for student list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--fields', default='',
+            help='Comma separated sparse fieldset, e.g. id,full_name,current_class'
+        )
+
+    def handle(self, *args, **options):
+        fields = [name for name in options['fields'].split(',') if name]
+        fieldset = {'fields': fields} if fields else {}
+        try:
+            with transaction.atomic():
+                create_students(options['rows'], prefix='ROWS')
+                self._run(options['rows'], options['repeat'], fieldset)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _run(self, rows, repeat, fieldset):
+        renderer = JSONRenderer()
+        queryset = Student.objects.order_by('first_name', 'last_name', 'id')[:rows]
+
+        def serializer_path():
+            data = StudentListSerializer(
+                queryset.all(), many=True, context={'sparse_fieldset': fieldset}
+            ).data
+            return renderer.render(data)
+
+        def encoder_path():
+            encoder = StudentListEncoder(fieldset)
+            return renderer.render(encoder.encode(encoder.queryset(queryset.all())))
+
+        if serializer_path() != encoder_path():
+            raise CommandError('Encoder output differs from StudentListSerializer')
+
+        results = {}
+        for label, path in [('serializer', serializer_path), ('encoder', encoder_path)]:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                path()
+            results[label] = (time.perf_counter() - started) / repeat
+
+        self.stdout.write(f"{'path':>12} {'ms/page':>10} {'us/row':>10}")
+        for label, elapsed in results.items():
+            self.stdout.write(
+                f'{label:>12} {elapsed * 1000:>10.2f} {elapsed * 1e6 / rows:>10.2f}'
+            )
+        self.stdout.write(
+            f"Speed-up: {results['serializer'] / results['encoder']:.1f}x "
+            f'(output identical, {rows} rows)'
+        )
@@ -0,0 +1,56 @@
+"""
+Benchmark student search latency on a large synthetic table.
+
+Rows are inserted inside a transaction that is rolled back afterwards.
+Reports p50/p95/max per query for the ranked search used by student_search.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from students.models import Student
+from students.search import search_students
+from ._synthetic import Rollback, create_students
+
+DEFAULT_QUERIES = ['emma', 'smith', 'olivr', 'jonson', 'grace walker', 'SRCH00001234']
+
+
+class Command(BaseCommand):
+    help = 'Measure student search latency percentiles on a synthetic table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--query', action='append', dest='queries')
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Inserting {options['rows']} synthetic students...")
+                create_students(options['rows'], prefix='SRCH')
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'ANALYZE {Student._meta.db_table}')
+                self._measure(queries, options['repeat'], options['page_size'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _measure(self, queries, repeat, page_size):
+        self.stdout.write(f"{'query':<16} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for query in queries:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = list(search_students(Student.objects.all(), query, rank=True)[:page_size])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{query:<16} {len(hits):>6} {statistics.median(timings):>8.1f} '
+                f'{p95:>8.1f} {timings[-1]:>8.1f}'
+            )
@@ -0,0 +1,57 @@
+"""
+Benchmark ``compute_student_stats`` against growing table sizes.
+
+Synthetic students are inserted inside a transaction that is rolled back, so
+the command is safe to run against a development database.
+"""
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+
+from students.stats import compute_student_stats
+from ._synthetic import Rollback, create_students
+
+
+class Command(BaseCommand):
+    help = 'Measure query count, wall time and peak Python memory of student stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000, 40000],
+            help='Table sizes to measure (synthetic rows added per step)'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>10} {'queries':>8} {'ms/call':>10} {'peak KiB':>10}")
+        try:
+            with transaction.atomic():
+                inserted = 0
+                for size in sorted(options['sizes']):
+                    create_students(size - inserted, prefix=f'BENCH{size}-')
+                    inserted = size
+                    self._measure(size, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _measure(self, size, repeat):
+        connection.force_debug_cursor = True
+        reset_queries()
+        compute_student_stats()
+        queries = len(connection.queries)
+        connection.force_debug_cursor = False
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            compute_student_stats()
+        elapsed = (time.perf_counter() - started) / repeat
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f'{size:>10} {queries:>8} {elapsed * 1000:>10.1f} {peak / 1024:>10.1f}'
+        )
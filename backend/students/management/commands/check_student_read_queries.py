@@ -0,0 +1,122 @@
+"""
+Count the SQL statements behind the student detail, documents and notes
+endpoints and fail if any exceeds its budget or grows with the number of
+related rows.
+
+A student is given 1, then ``--steps`` more documents and notes at a time,
+each uploaded or written by a different user, and every endpoint is fetched
+at each size. The count must stay the same as the rows grow (no N+1 over
+documents, notes or their authors) and within ``BUDGETS``. Requests are
+force-authenticated, so authentication is not counted. Everything runs
+inside a transaction that is rolled back.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from students.models import StudentDocument, StudentNote
+from ._synthetic import Rollback, build_students
+
+User = get_user_model()
+
+# Endpoint -> maximum statements
+BUDGETS = {
+    # updated_at validator read, student with user/created_by/updated_by,
+    # documents with uploaders, notes with authors
+    'detail': 4,
+    # page count, documents with uploaders
+    'documents': 2,
+    # page count, notes with authors
+    'notes': 2,
+}
+
+
+class Command(BaseCommand):
+    help = 'Check that the student detail, documents and notes endpoints run a fixed number of queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--steps', type=int, nargs='+', default=[5, 20],
+                            help='Documents and notes to add before each further measurement')
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                results = self._measure(options['steps'])
+                raise Rollback
+        except Rollback:
+            pass
+
+        failures = []
+        sizes = sorted({size for counts in results.values() for size in counts})
+        self.stdout.write(f"{'endpoint':<12} " + ' '.join(f'{f"n={size}":>7}' for size in sizes) + '  budget')
+        for endpoint, counts in results.items():
+            budget = BUDGETS[endpoint]
+            self.stdout.write(
+                f'{endpoint:<12} ' + ' '.join(f'{counts[size][0]:>7}' for size in sizes) + f'  {budget:>6}'
+            )
+            first, *rest = (counts[size] for size in sizes)
+            if first[0] > budget or any(count != first[0] for count, _ in rest):
+                failures.append(endpoint)
+                for sql in counts[sizes[-1]][1]:
+                    self.stdout.write(f'    {sql[:150]}')
+        if failures:
+            raise CommandError(f'Over budget or growing with related rows: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All student read endpoints run a fixed number of queries'))
+
+    def _count(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_ACCEPT='application/json')
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}')
+        statements = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].upper().startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ]
+        return len(statements), statements
+
+    def _measure(self, steps):
+        (student,) = build_students(1, prefix='QR', seed=7)
+        student.student_id = ''
+        student.save()
+        staff = User.objects.create_user(email='read-budget@example.com', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(staff)
+
+        urls = {
+            'detail': f'/api/students/{student.pk}/',
+            'documents': f'/api/students/{student.pk}/documents/',
+            'notes': f'/api/students/{student.pk}/notes/',
+        }
+        results = {endpoint: {} for endpoint in urls}
+        size = 0
+        for added in [1, *steps]:
+            self._add_related(student, size, added)
+            size += added
+            for endpoint, url in urls.items():
+                results[endpoint][size] = self._count(client, url)
+        return results
+
+    def _add_related(self, student, start, count):
+        """``count`` documents and notes, each by a different new user"""
+        authors = User.objects.bulk_create([
+            User(email=f'read-budget-{number}@example.com', first_name='Author', last_name=str(number))
+            for number in range(start, start + count)
+        ])
+        StudentDocument.objects.bulk_create([
+            StudentDocument(
+                student=student, document_type='other', title=f'Document {number}',
+                file=f'students/documents/read-budget-{number}.pdf', file_size_bytes=1024,
+                uploaded_by=author,
+            )
+            for number, author in enumerate(authors, start=start)
+        ])
+        StudentNote.objects.bulk_create([
+            StudentNote(
+                student=student, note_type='general', title=f'Note {number}',
+                content='Query budget check', created_by=author,
+            )
+            for number, author in enumerate(authors, start=start)
+        ])
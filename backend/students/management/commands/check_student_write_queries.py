@@ -0,0 +1,97 @@
+"""
+Count the SQL statements behind common student writes and fail if any
+exceeds its budget.
+
+This locks in the signal work in ``students.signals``/``accounts.signals``:
+creating a student with an email inserts the user, its profile and the
+student once each, and saves that change nothing the user account mirrors
+do not touch the user at all. Everything runs inside a transaction that is
+rolled back. Savepoint statements are not counted.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from students.models import Student
+from ._synthetic import Rollback, build_students
+
+# Scenario -> maximum statements
+BUDGETS = {
+    # student id block, user INSERT, profile INSERT, student INSERT, counters upsert
+    'create with email': 5,
+    'create without email': 3,
+    # Full saves read the locked row for the counters even without dirty
+    # counted fields, since a stale instance may overwrite them
+    'save without changes': 2,
+    # locked counter read, student UPDATE, user SELECT + UPDATE
+    'rename (syncs user)': 4,
+    'change notes only': 2,
+    'change notes only (update_fields)': 1,
+    # locked counter read, student UPDATE, counters upsert, user UPDATE
+    # (the user is already loaded by the rename)
+    'change status (syncs user, counters)': 4,
+}
+
+
+class Command(BaseCommand):
+    help = 'Check the number of SQL statements used by student writes against budgets'
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                results = self._measure()
+                raise Rollback
+        except Rollback:
+            pass
+
+        failures = []
+        for scenario, (count, statements) in results.items():
+            budget = BUDGETS[scenario]
+            self.stdout.write(f'{scenario:<40} {count:>3} / {budget}')
+            if count > budget:
+                failures.append(scenario)
+                for sql in statements:
+                    self.stdout.write(f'    {sql[:150]}')
+        if failures:
+            raise CommandError(f'Over budget: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All student write paths are within budget'))
+
+    def _count(self, action):
+        with CaptureQueriesContext(connection) as context:
+            action()
+        statements = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].upper().startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ]
+        return len(statements), statements
+
+    def _measure(self):
+        with_email, without_email = build_students(2, prefix='QC', seed=7)
+        for student in (with_email, without_email):
+            student.student_id = ''
+            student.status = 'active'
+        with_email.email = 'query-budget@example.com'
+
+        results = {
+            'create with email': self._count(with_email.save),
+            'create without email': self._count(without_email.save),
+        }
+
+        student = Student.objects.get(pk=with_email.pk)
+        results['save without changes'] = self._count(student.save)
+
+        student.first_name = 'Renamed'
+        results['rename (syncs user)'] = self._count(student.save)
+
+        student.notes = 'Updated notes'
+        results['change notes only'] = self._count(student.save)
+
+        student.notes = 'Updated notes again'
+        results['change notes only (update_fields)'] = self._count(
+            lambda: student.save(update_fields=['notes'])
+        )
+
+        student.status = 'suspended'
+        results['change status (syncs user, counters)'] = self._count(student.save)
+        return results
@@ -0,0 +1,55 @@
+"""
+Import students from a CSV or XLSX file using the batched bulk importer.
+"""
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importer import DEFAULT_BATCH_SIZE, ImportFormatError, StudentImporter, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bulk import students from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv or .xlsx file')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without inserting')
+        parser.add_argument('--created-by', help='Email of the user recorded as creator')
+        parser.add_argument('--report', help='Write the full JSON error report to this path')
+
+    def handle(self, *args, **options):
+        created_by = None
+        if options['created_by']:
+            try:
+                created_by = User.objects.get(email=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['created_by']}")
+
+        importer = StudentImporter(
+            created_by=created_by,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = importer.run(iter_rows(fileobj, options['path']))
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        rate = report['total_rows'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"rows={report['total_rows']} created={report['created']} "
+            f"failed={report['failed']} seconds={elapsed:.2f} rows/s={rate:.0f}"
+        )
+        for error in report['errors'][:20]:
+            self.stdout.write(self.style.WARNING(f"row {error['row']}: {error['errors']}"))
+        if options['report']:
+            with open(options['report'], 'w') as fileobj:
+                json.dump(report, fileobj, indent=2, default=str)
@@ -0,0 +1,35 @@
+"""
+Rebuild the enrollment counters from the students table and report drift.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from students import counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the enrollment counters from scratch and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true', help='Report drift without rewriting the counters'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drift = counters.rebuild(dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        for (dimension, value), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f'{dimension:>16} {value or "-":<24} stored {stored:>8} actual {actual:>8} '
+                f'({actual - stored:+d})'
+            )
+
+        action = 'Checked' if options['dry_run'] else 'Rebuilt'
+        message = f'{action} enrollment counters in {elapsed:.2f}s: {len(drift)} drifted'
+        if drift:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
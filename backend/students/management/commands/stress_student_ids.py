@@ -0,0 +1,71 @@
+"""
+Concurrency stress test for student ID allocation.
+
+Runs many parallel ``Student`` creates (and optionally block reservations)
+and checks that every allocated ID is unique and that no insert had to be
+retried because of a unique-constraint violation.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection
+
+from students.models import Student
+from ._synthetic import build_students
+
+
+class Command(BaseCommand):
+    help = 'Create students from parallel threads and verify student_id uniqueness'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--per-worker', type=int, default=50)
+        parser.add_argument(
+            '--block-size', type=int, default=25,
+            help='Each worker also reserves a block of this many IDs (0 to skip)'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the created students')
+
+    def handle(self, *args, **options):
+        workers, per_worker = options['workers'], options['per_worker']
+        block_size = options['block_size']
+        lock = threading.Lock()
+        allocated, created_pks = [], []
+        conflicts = 0
+
+        def work(worker):
+            nonlocal conflicts
+            try:
+                if block_size:
+                    block = Student.allocate_student_ids(block_size)
+                    with lock:
+                        allocated.extend(block)
+                for student in build_students(per_worker, seed=worker):
+                    student.student_id = ''
+                    try:
+                        student.save()
+                    except IntegrityError:
+                        with lock:
+                            conflicts += 1
+                        continue
+                    with lock:
+                        allocated.append(student.student_id)
+                        created_pks.append(student.pk)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, range(workers)))
+
+        duplicates = len(allocated) - len(set(allocated))
+        self.stdout.write(
+            f'workers={workers} creates={len(created_pks)} '
+            f'allocated={len(allocated)} duplicates={duplicates} conflicts={conflicts}'
+        )
+        if not options['keep']:
+            Student.objects.filter(pk__in=created_pks).delete()
+
+        if duplicates or conflicts:
+            raise CommandError('Student ID allocation is not race-free')
+        self.stdout.write(self.style.SUCCESS('No duplicate IDs and no retries'))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each year's counter after the highest existing generated ID"""
+    Student = apps.get_model('students', 'Student')
+    StudentIdSequence = apps.get_model('students', 'StudentIdSequence')
+    last_values = {}
+    for student_id in Student.objects.filter(student_id__regex=r'^STU[0-9]{5,}$').values_list('student_id', flat=True).iterator():
+        year, number = int(student_id[3:7]), int(student_id[7:])
+        last_values[year] = max(last_values.get(year, 0), number)
+    StudentIdSequence.objects.bulk_create(
+        StudentIdSequence(year=year, last_value=last_value)
+        for year, last_value in last_values.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentIdSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Student ID Sequence',
+                'verbose_name_plural': 'Student ID Sequences',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
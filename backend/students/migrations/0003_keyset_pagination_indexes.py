@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:12
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_id_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['first_name', 'last_name', 'id'], name='student_name_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'first_name', 'last_name', 'id'], name='student_status_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Upper('current_class'), models.F('first_name'), models.F('last_name'), models.F('id'), name='student_class_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', coalesce({row}first_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}last_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}student_id, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}middle_name, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}email, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce({row}phone_number, '')), 'C')
+"""
+
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION students_student_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER students_student_search_vector_trigger
+BEFORE INSERT OR UPDATE OF first_name, middle_name, last_name, student_id, email, phone_number
+ON students_student
+FOR EACH ROW EXECUTE FUNCTION students_student_search_vector_update();
+
+UPDATE students_student SET search_vector = {backfill};
+""".format(vector=SEARCH_VECTOR_SQL.format(row='NEW.'), backfill=SEARCH_VECTOR_SQL.format(row=''))
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS students_student_search_vector_trigger ON students_student;
+DROP FUNCTION IF EXISTS students_student_search_vector_update();
+"""
+
+SEARCH_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='student_search_vector_idx'),
+    django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='student_first_name_trgm_idx', opclasses=['gin_trgm_ops']),
+    django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='student_last_name_trgm_idx', opclasses=['gin_trgm_ops']),
+]
+
+
+def create_search_objects(apps, schema_editor):
+    """GIN indexes and the maintenance trigger only exist on PostgreSQL"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Student = apps.get_model('students', 'Student')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Student, index)
+    schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Student = apps.get_model('students', 'Student')
+    schema_editor.execute(DROP_TRIGGER_SQL)
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Student, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='student',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='student', index=index)
+                for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_objects, drop_search_objects),
+            ],
+        ),
+    ]
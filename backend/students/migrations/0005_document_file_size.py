@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+def record_file_sizes(apps, schema_editor):
+    """Stat existing uploads once so serializers never have to"""
+    StudentDocument = apps.get_model('students', 'StudentDocument')
+    documents = []
+    for document in StudentDocument.objects.exclude(file='').iterator():
+        try:
+            document.file_size_bytes = document.file.size
+        except (OSError, ValueError):
+            continue
+        documents.append(document)
+    StudentDocument.objects.bulk_update(documents, ['file_size_bytes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_student_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentdocument',
+            name='file_size_bytes',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='Size of the file, recorded on upload', null=True),
+        ),
+        migrations.RunPython(record_file_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """
+    Count the existing students once; signals keep the counters current
+    afterwards. The counting is inlined (as ``students.counters`` counted at
+    the time) so later changes to app code cannot alter this migration.
+    """
+    Student = apps.get_model('students', 'Student')
+    StudentCounter = apps.get_model('students', 'StudentCounter')
+    students = Student.objects.order_by()
+    
+    counts = {}
+    
+    def add(key, n):
+        counts[key] = counts.get(key, 0) + n
+    
+    for dimension, field in [('status', 'status'), ('class', 'current_class'), ('gender', 'gender')]:
+        for row in students.values(field).annotate(n=models.Count('pk')):
+            add((dimension, row[field]), row['n'])
+    for row in students.values('admission_date').annotate(n=models.Count('pk')):
+        if row['admission_date'] is not None:
+            add(('admission_month', str(row['admission_date'])[:7]), row['n'])
+    for row in students.values('date_of_birth').annotate(n=models.Count('pk')):
+        if row['date_of_birth'] is not None:
+            add(('birth_date', str(row['date_of_birth'])[:10]), row['n'])
+    add(('total', ''), students.count())
+    add(('active', ''), students.filter(status='active', enrollment_status=True).count())
+    
+    StudentCounter.objects.bulk_create(
+        StudentCounter(dimension=dimension, value=value, count=count)
+        for (dimension, value), count in counts.items()
+        if count
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_document_file_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(blank=True, max_length=100)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Student Counter',
+                'verbose_name_plural': 'Student Counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentcounter',
+            constraint=models.UniqueConstraint(fields=('dimension', 'value'), name='student_counter_unique_key'),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
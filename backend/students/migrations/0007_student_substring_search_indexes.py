@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:04
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+SUBSTRING_INDEXES = [
+    django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('student_id'), name='gin_trgm_ops'), name='student_id_upper_trgm_idx'),
+    django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'), name='student_email_upper_trgm_idx'),
+    django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('phone_number'), name='gin_trgm_ops'), name='student_phone_upper_trgm_idx'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    """Trigram indexes only exist on PostgreSQL (pg_trgm is enabled by 0004)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Student = apps.get_model('students', 'Student')
+    for index in SUBSTRING_INDEXES:
+        schema_editor.add_index(Student, index)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Student = apps.get_model('students', 'Student')
+    for index in SUBSTRING_INDEXES:
+        schema_editor.remove_index(Student, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_student_counters'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='student', index=index)
+                for index in SUBSTRING_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
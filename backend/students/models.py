@@ -1,14 +1,20 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower, Upper
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from datetime import date
 import uuid
 
+from core.tracking import DirtyFieldsMixin
+
 User = get_user_model()
 
 
-class Student(models.Model):
+class Student(DirtyFieldsMixin, models.Model):
     """
     Comprehensive Student model for school management system
     """
@@ -115,6 +121,9 @@ class Student(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_students')
     updated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='updated_students')
     
+    # Full-text search document, maintained by a database trigger (see students.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['first_name', 'last_name']
         verbose_name = 'Student'
@@ -124,6 +133,23 @@ class Student(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['current_class']),
             models.Index(fields=['admission_date']),
+            # Keyset pagination indexes (see students.pagination)
+            models.Index(fields=['first_name', 'last_name', 'id'], name='student_name_keyset_idx'),
+            models.Index(fields=['status', 'first_name', 'last_name', 'id'], name='student_status_keyset_idx'),
+            models.Index(
+                Upper('current_class'), F('first_name'), F('last_name'), F('id'),
+                name='student_class_keyset_idx'
+            ),
+            # Case-insensitive email lookups (see students.importer)
+            models.Index(Lower('email'), name='student_email_lower_idx'),
+            # Search indexes (PostgreSQL only, created by migration 0004)
+            GinIndex(fields=['search_vector'], name='student_search_vector_idx'),
+            GinIndex(fields=['first_name'], opclasses=['gin_trgm_ops'], name='student_first_name_trgm_idx'),
+            GinIndex(fields=['last_name'], opclasses=['gin_trgm_ops'], name='student_last_name_trgm_idx'),
+            # Substring (icontains) search, which compares UPPER(field) (PostgreSQL only, migration 0007)
+            GinIndex(OpClass(Upper('student_id'), name='gin_trgm_ops'), name='student_id_upper_trgm_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='student_email_upper_trgm_idx'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='student_phone_upper_trgm_idx'),
         ]
     
     def __str__(self):
@@ -160,23 +186,108 @@ class Student(models.Model):
         address_parts.extend([self.city, self.county, self.postal_code, self.country])
         return ', '.join(address_parts)
     
+    @staticmethod
+    def format_student_id(year, number):
+        """Format a sequence number as a student ID, e.g. STU20240001"""
+        return f"STU{year}{number:04d}"
+    
+    @classmethod
+    def allocate_student_ids(cls, count=1, year=None):
+        """
+        Reserve ``count`` consecutive student IDs for ``year`` (default: this year)
+        """
+        year = year or timezone.now().year
+        numbers = StudentIdSequence.reserve(year, count)
+        return [cls.format_student_id(year, number) for number in numbers]
+    
     def save(self, *args, **kwargs):
         # Auto-generate student ID if not provided
         if not self.student_id:
-            year = timezone.now().year
-            last_student = Student.objects.filter(
-                student_id__startswith=f"STU{year}"
-            ).order_by('student_id').last()
-            
-            if last_student:
-                last_number = int(last_student.student_id[-4:])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            
-            self.student_id = f"STU{year}{new_number:04d}"
+            self.student_id = self.allocate_student_ids()[0]
         
-        super().save(*args, **kwargs)
+        # The enrollment counters are updated by signals in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class StudentIdSequence(models.Model):
+    """
+    Per-year counter backing auto-generated student IDs.
+    
+    Numbers are handed out by a single upsert that increments the row in
+    place, so concurrent admissions never see the same value. The upsert runs
+    in the caller's transaction: a rollback hands the numbers back for reuse,
+    and the year's row stays locked until that transaction ends, so other
+    admissions for the same year wait for it. Keep transactions that reserve
+    numbers short (outside one, the upsert commits on its own).
+    """
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Student ID Sequence'
+        verbose_name_plural = 'Student ID Sequences'
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+    
+    @classmethod
+    def reserve(cls, year, count=1):
+        """Atomically reserve ``count`` numbers for ``year`` and return them as a range"""
+        if count < 1:
+            raise ValueError('count must be at least 1')
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (year, last_value) VALUES (%s, %s) "
+                f"ON CONFLICT (year) DO UPDATE "
+                f"SET last_value = {table}.last_value + EXCLUDED.last_value "
+                f"RETURNING last_value",
+                [year, count]
+            )
+            last_value = cursor.fetchone()[0]
+        return range(last_value - count + 1, last_value + 1)
+
+
+class StudentCounter(models.Model):
+    """
+    Incrementally maintained enrollment counts (see ``students.counters``).
+    
+    One row per (dimension, value), e.g. ``('status', 'active')`` or
+    ``('admission_month', '2024-09')``. Counts are adjusted with a single
+    upsert so concurrent writers never lose updates.
+    """
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=100, blank=True)
+    count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Student Counter'
+        verbose_name_plural = 'Student Counters'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value'], name='student_counter_unique_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}={self.value}: {self.count}"
+    
+    @classmethod
+    def apply(cls, deltas):
+        """Add a mapping of ``(dimension, value) -> delta`` to the stored counts"""
+        params = [
+            (dimension, value, delta)
+            for (dimension, value), delta in sorted(deltas.items()) if delta
+        ]
+        if not params:
+            return
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} (dimension, value, count) VALUES (%s, %s, %s) "
+                f"ON CONFLICT (dimension, value) DO UPDATE "
+                f"SET count = {table}.count + EXCLUDED.count",
+                params
+            )
 
 
 class StudentDocument(models.Model):
@@ -196,6 +307,7 @@ class StudentDocument(models.Model):
     document_type = models.CharField(max_length=50, choices=DOCUMENT_TYPES)
     title = models.CharField(max_length=200)
     file = models.FileField(upload_to='students/documents/')
+    file_size_bytes = models.BigIntegerField(null=True, blank=True, editable=False, help_text="Size of the file, recorded on upload")
     description = models.TextField(blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -207,6 +319,14 @@ class StudentDocument(models.Model):
     
     def __str__(self):
         return f"{self.student.get_full_name()} - {self.title}"
+    
+    def save(self, *args, **kwargs):
+        # Record the size while the upload is at hand so reads never stat storage
+        if self.file and (self.file_size_bytes is None or not self.file._committed):
+            self.file_size_bytes = self.file.size
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'file_size_bytes'}
+        super().save(*args, **kwargs)
 
 
 class StudentNote(models.Model):
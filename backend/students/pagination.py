@@ -0,0 +1,193 @@
+"""
+Pagination classes for the students API.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StudentKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a stable (first_name, last_name, id) order.
+
+    Each page is fetched with a range condition on the keyset instead of an
+    OFFSET, and no COUNT(*) is run, so every page costs the same as the first.
+    Matching composite indexes are declared on ``Student.Meta.indexes``.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    keyset = ('first_name', 'last_name', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare(queryset, request)
+        return self.set_page(list(queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare(queryset, request)
+        return self.set_page([row async for row in queryset[:self.page_size + 1]])
+
+    def prepare(self, queryset, request):
+        """Read the request's cursor and return the ordered, filtered queryset"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor['reverse'])
+        ordering = [f'-{field}' for field in self.keyset] if self.reverse else list(self.keyset)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self.keyset_filter(self.cursor['position'], self.reverse))
+        return queryset
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = self.cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        self.page = results
+        return results
+
+    def keyset_filter(self, position, reverse):
+        """
+        Rows strictly after ``position`` in keyset order (before, if reversed).
+
+        The leading ``>=`` on the first column is redundant but gives the
+        planner an index range to scan.
+        """
+        op = 'lt' if reverse else 'gt'
+        condition = Q(**{f'{self.keyset[0]}__{op}e': position[0]})
+        alternatives = Q()
+        for index, field in enumerate(self.keyset):
+            equal = {name: position[i] for i, name in enumerate(self.keyset[:index])}
+            alternatives |= Q(**equal, **{f'{field}__{op}': position[index]})
+        return condition & alternatives
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = data['p']
+            if len(position) != len(self.keyset):
+                raise ValueError
+            return {'reverse': bool(data.get('r')), 'position': position}
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        position = [str(getattr(instance, field)) for field in self.keyset]
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class StudentPagination(PageNumberPagination):
+    """
+    Custom pagination for students
+
+    Page numbers are used by default; pass ``pagination=cursor`` (or follow a
+    ``cursor`` link) to switch to keyset pagination.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    keyset_pagination_class = StudentKeysetPagination
+    keyset_paginator = None
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return self.keyset_paginator.paginate_queryset(queryset, request, view)
+        self.keyset_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset()`` for async views. Django's ``Paginator`` is
+        sync-only, so the count and the page slice are fetched here and
+        handed to it.
+        """
+        if self.use_keyset(request):
+            self.keyset_paginator = self.keyset_pagination_class()
+            return await self.keyset_paginator.apaginate_queryset(queryset, request, view)
+        self.keyset_paginator = None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        bottom = (number - 1) * page_size
+        rows = [row async for row in queryset[bottom:bottom + page_size]]
+        self.page = paginator._get_page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,180 @@
+"""
+Versioned result cache for the read-heavy student list endpoints.
+
+Responses are cached in the ``default`` cache under keys that embed a
+generation counter for their namespace. Any write to students bumps the
+counters (from the model signals, and explicitly after queryset ``update()``
+and ``bulk_create()`` calls), so old entries are never read again and simply
+expire. ``acached_response()`` and ``acache_results()`` read and write the
+same entries from async views.
+"""
+import hashlib
+import json
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+NAMESPACES = ('list', 'search', 'by_class', 'by_status')
+
+GENERATION_KEY = 'students:results:{namespace}:generation'
+ENTRY_KEY = 'students:results:{namespace}:{generation}:{digest}'
+
+DEFAULT_TIMEOUT = 300
+
+_stats_lock = threading.Lock()
+_stats = {namespace: {'hits': 0, 'misses': 0} for namespace in NAMESPACES}
+
+
+def get_timeout():
+    return getattr(settings, 'STUDENT_RESULT_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def new_generation():
+    """
+    Seed for a missing counter. Time based, so a counter that was evicted
+    never restarts at a value that old entries were stored under.
+    """
+    return time.time_ns() // 1000
+
+
+def get_generation(namespace):
+    key = GENERATION_KEY.format(namespace=namespace)
+    generation = cache.get(key)
+    if generation is None:
+        generation = new_generation()
+        if not cache.add(key, generation, None):
+            generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(namespace):
+    key = GENERATION_KEY.format(namespace=namespace)
+    generation = await cache.aget(key)
+    if generation is None:
+        generation = new_generation()
+        if not await cache.aadd(key, generation, None):
+            generation = await cache.aget(key)
+    return generation
+
+
+def invalidate(*namespaces):
+    """Bump the generation of ``namespaces`` (all of them by default)"""
+    for namespace in namespaces or NAMESPACES:
+        key = GENERATION_KEY.format(namespace=namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), None)
+
+
+def request_digest(request):
+    """Hash everything that can change the response body"""
+    body = None
+    if request.method not in ('GET', 'HEAD'):
+        data = request.data
+        if hasattr(data, 'lists'):
+            data = dict(data.lists())
+        body = data
+    normalized = json.dumps(
+        [
+            request.method,
+            request.build_absolute_uri(request.path),
+            sorted(request.query_params.lists()),
+            body,
+        ],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def record(namespace, hit):
+    with _stats_lock:
+        _stats[namespace]['hits' if hit else 'misses'] += 1
+
+
+def cached_response(namespace, request, build):
+    """
+    Return the cached data for ``request`` or call ``build()`` and cache its
+    response if it was successful.
+    """
+    timeout = get_timeout()
+    if not timeout:
+        return build()
+
+    generation = get_generation(namespace)
+    key = None
+    if generation is not None:
+        key = ENTRY_KEY.format(
+            namespace=namespace, generation=generation, digest=request_digest(request)
+        )
+        data = cache.get(key)
+        if data is not None:
+            record(namespace, hit=True)
+            return Response(data)
+
+    record(namespace, hit=False)
+    response = build()
+    if key is not None and response.status_code == 200:
+        cache.set(key, response.data, timeout)
+    return response
+
+
+def cache_results(namespace):
+    """Decorator for function views, applied beneath ``@api_view``"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return cached_response(namespace, request, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+async def acached_response(namespace, request, build):
+    """``cached_response()`` for async views; ``build`` is a coroutine function"""
+    timeout = get_timeout()
+    if not timeout:
+        return await build()
+
+    generation = await aget_generation(namespace)
+    key = None
+    if generation is not None:
+        key = ENTRY_KEY.format(
+            namespace=namespace, generation=generation, digest=request_digest(request)
+        )
+        data = await cache.aget(key)
+        if data is not None:
+            record(namespace, hit=True)
+            return Response(data)
+
+    record(namespace, hit=False)
+    response = await build()
+    if key is not None and response.status_code == 200:
+        await cache.aset(key, response.data, timeout)
+    return response
+
+
+def acache_results(namespace):
+    """Decorator for async views, applied beneath ``@async_api_view``"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            return await acached_response(namespace, request, lambda: view(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def metrics():
+    """Hit/miss counts and ratios for this process"""
+    with _stats_lock:
+        report = {}
+        for namespace, counts in _stats.items():
+            total = counts['hits'] + counts['misses']
+            report[namespace] = {
+                **counts,
+                'hit_ratio': round(counts['hits'] / total, 4) if total else None,
+            }
+    return report
@@ -0,0 +1,107 @@
+"""
+Text search over students.
+
+On PostgreSQL the search uses the trigger-maintained ``search_vector``
+column (GIN indexed) for word and prefix matches, plus pg_trgm similarity on
+first and last names so misspelt names still match. Student ids, emails and
+phone numbers also keep matching anywhere inside (the middle of a phone
+number, an email domain, a student id suffix) through ``icontains`` backed by
+trigram indexes, as they did before full-text search. Results can be ranked
+by relevance. Other databases fall back to the original ``icontains`` scan.
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, TrigramSimilarity,
+)
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+# Fields scanned by the icontains fallback
+FALLBACK_FIELDS = [
+    'first_name', 'last_name', 'middle_name', 'student_id', 'email', 'phone_number',
+]
+
+# Identifiers still matched as substrings on PostgreSQL (trigram indexed)
+SUBSTRING_FIELDS = ['student_id', 'email', 'phone_number']
+
+# Names whose trigram similarity to a search term is used for typo tolerance
+TRIGRAM_FIELDS = ['first_name', 'last_name']
+
+TOKEN_RE = re.compile(r'[\w@.+-]+', re.UNICODE)
+
+
+def supports_full_text(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def tokenize(query):
+    """Split a query into tsquery-safe terms"""
+    return [token.lower() for token in TOKEN_RE.findall(query or '')][:8]
+
+
+def prefix_query(tokens):
+    """Every term must match, each as a prefix (``emm & smi`` matches Emma Smith)"""
+    terms = []
+    for token in tokens:
+        # Strip characters with meaning in tsquery syntax
+        term = re.sub(r"[&|!():*'\\]", '', token)
+        if term:
+            terms.append(f"'{term}':*")
+    return SearchQuery(' & '.join(terms), search_type='raw', config='simple')
+
+
+def search_students(queryset, query, rank=False):
+    """
+    Filter ``queryset`` to students matching ``query``.
+
+    With ``rank=True`` a ``search_rank`` annotation combining full-text rank
+    and name similarity is added and results are ordered by it.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+
+    if not supports_full_text(queryset):
+        condition = Q()
+        for field in FALLBACK_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+    ts_query = prefix_query(tokens)
+    condition = Q(search_vector=ts_query)
+    for field in SUBSTRING_FIELDS:
+        condition |= Q(**{f'{field}__icontains': query.strip()})
+    for token in tokens:
+        for field in TRIGRAM_FIELDS:
+            condition |= Q(**{f'{field}__trigram_similar': token})
+    queryset = queryset.filter(condition)
+
+    if rank:
+        similarity = Greatest(*[
+            TrigramSimilarity(field, token)
+            for token in tokens for field in TRIGRAM_FIELDS
+        ])
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), ts_query) + similarity
+        ).order_by('-search_rank', 'first_name', 'last_name', 'id')
+    return queryset
+
+
+class StudentSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that routes ``?search=`` through the full-text backend.
+
+    Ordering is left to OrderingFilter so the list view keeps its ordering.
+    Without PostgreSQL the stock per-term ``icontains`` behaviour is kept.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not supports_full_text(queryset):
+            return super().filter_queryset(request, queryset, view)
+        query = ' '.join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        return search_students(queryset, query)
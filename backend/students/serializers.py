@@ -1,11 +1,74 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+
+from core.serializers import TimedSerializerMixin
+
 from .models import Student, StudentDocument, StudentNote
 
 User = get_user_model()
 
 
-class StudentDocumentSerializer(serializers.ModelSerializer):
+def parse_field_list(value):
+    """Split a comma separated ``?fields=``/``?exclude=`` value"""
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def get_sparse_fieldset(request):
+    """Read the requested field selection from the query string"""
+    return {
+        'fields': parse_field_list(request.query_params.get('fields')),
+        'exclude': parse_field_list(request.query_params.get('exclude')),
+    }
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients narrow the output with ``?fields=a,b`` or ``?exclude=a,b``.
+    
+    The selection comes from ``context['sparse_fieldset']`` when given,
+    otherwise from the request in the context. ``get_query_columns()``
+    reports the model columns the remaining fields read so views can pass
+    them to ``QuerySet.only()``. ``Meta.field_columns`` maps computed fields
+    to the columns they depend on.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('sparse_fieldset')
+        if fieldset is None and self.context.get('request') is not None:
+            fieldset = get_sparse_fieldset(self.context['request'])
+        if not fieldset:
+            return
+        if fieldset.get('fields') is not None:
+            for name in set(self.fields) - set(fieldset['fields']):
+                self.fields.pop(name)
+        for name in fieldset.get('exclude') or []:
+            self.fields.pop(name, None)
+    
+    def get_query_columns(self):
+        """
+        Return ``(columns, related)`` for ``only()``/``select_related()``,
+        or None if some field reads data that cannot be mapped to columns.
+        """
+        field_columns = getattr(self.Meta, 'field_columns', {})
+        model_fields = {field.name for field in self.Meta.model._meta.concrete_fields}
+        columns, related = set(), set()
+        for name, field in self.fields.items():
+            if name in field_columns:
+                columns.update(field_columns[name])
+                continue
+            relation, _, attribute = field.source.partition('.')
+            if relation not in model_fields:
+                return None
+            columns.add(relation)
+            if attribute:
+                related.add(relation)
+        return columns, related
+
+
+class StudentDocumentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for student documents"""
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
     file_size = serializers.SerializerMethodField()
@@ -21,7 +84,10 @@ class StudentDocumentSerializer(serializers.ModelSerializer):
     def get_file_size(self, obj):
         """Get file size in human readable format"""
         if obj.file:
-            size = obj.file.size
+            size = obj.file_size_bytes
+            if size is None:
+                # Documents uploaded before sizes were recorded
+                size = obj.file.size
             for unit in ['B', 'KB', 'MB', 'GB']:
                 if size < 1024.0:
                     return f"{size:.1f} {unit}"
@@ -30,7 +96,7 @@ class StudentDocumentSerializer(serializers.ModelSerializer):
         return None
 
 
-class StudentNoteSerializer(serializers.ModelSerializer):
+class StudentNoteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for student notes"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     
@@ -43,7 +109,7 @@ class StudentNoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'created_by']
 
 
-class StudentListSerializer(serializers.ModelSerializer):
+class StudentListSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for student lists"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     age = serializers.IntegerField(source='get_age', read_only=True)
@@ -56,9 +122,14 @@ class StudentListSerializer(serializers.ModelSerializer):
             'email', 'phone_number', 'current_class', 'section',
             'status', 'admission_date', 'age', 'is_active', 'profile_picture'
         ]
+        field_columns = {
+            'full_name': ['first_name', 'middle_name', 'last_name'],
+            'age': ['date_of_birth'],
+            'is_active': ['status', 'enrollment_status'],
+        }
 
 
-class StudentDetailSerializer(serializers.ModelSerializer):
+class StudentDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Comprehensive serializer for student details"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     age = serializers.IntegerField(source='get_age', read_only=True)
@@ -80,7 +151,7 @@ class StudentDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Student
-        fields = '__all__'
+        exclude = ['search_vector']
         read_only_fields = [
             'id', 'created_at', 'updated_at', 'created_by', 'updated_by',
             'full_name', 'age', 'is_active', 'primary_contact', 'formatted_address'
@@ -115,7 +186,7 @@ class StudentDetailSerializer(serializers.ModelSerializer):
         return value
 
 
-class StudentCreateSerializer(serializers.ModelSerializer):
+class StudentCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating new students"""
     
     class Meta:
@@ -133,7 +204,12 @@ class StudentCreateSerializer(serializers.ModelSerializer):
             'medical_conditions', 'medications', 'doctor_name', 'doctor_phone',
             'profile_picture', 'notes'
         ]
-    
+        # Uniqueness is checked once by validate_email/validate_student_id
+        extra_kwargs = {
+            'email': {'validators': []},
+            'student_id': {'validators': []},
+        }
+
     def validate_email(self, value):
         """Validate email uniqueness"""
         if value and Student.objects.filter(email=value).exists():
@@ -147,7 +223,32 @@ class StudentCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class StudentUpdateSerializer(serializers.ModelSerializer):
+class StudentImportSerializer(StudentCreateSerializer):
+    """
+    Row validator for bulk imports.
+    
+    Uniqueness of email and student_id is checked per batch by the importer,
+    so the per-row queries of StudentCreateSerializer are disabled here.
+    """
+    
+    class Meta(StudentCreateSerializer.Meta):
+        fields = [
+            field for field in StudentCreateSerializer.Meta.fields
+            if field != 'profile_picture'
+        ] + ['status']
+        extra_kwargs = {
+            'email': {'validators': []},
+            'student_id': {'validators': [], 'required': False},
+        }
+    
+    def validate_email(self, value):
+        return value
+    
+    def validate_student_id(self, value):
+        return value
+
+
+class StudentUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for updating students"""
     
     class Meta:
@@ -175,7 +276,7 @@ class StudentUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class StudentStatsSerializer(serializers.Serializer):
+class StudentStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for student statistics"""
     total_students = serializers.IntegerField()
     active_students = serializers.IntegerField()
@@ -188,7 +289,7 @@ class StudentStatsSerializer(serializers.Serializer):
     age_distribution = serializers.DictField()
 
 
-class StudentSearchSerializer(serializers.Serializer):
+class StudentSearchSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for student search parameters"""
     query = serializers.CharField(required=False, allow_blank=True)
     status = serializers.ChoiceField(choices=Student.STATUS_CHOICES, required=False)
@@ -1,41 +1,63 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Student
+from .models import Student, StudentCounter, StudentDocument, StudentNote
+from . import autocomplete, counters, result_cache
 
 User = get_user_model()
 
 
-@receiver(post_save, sender=Student)
-def create_student_user_account(sender, instance, created, **kwargs):
+# Student fields mirrored onto the linked user account
+USER_SYNC_FIELDS = ['first_name', 'last_name', 'email', 'status', 'enrollment_status']
+
+# Changes to these never affect cached list/search results
+RESULT_IRRELEVANT_FIELDS = {'updated_at', 'user_id', 'search_vector'}
+
+
+def saved_changes(instance, update_fields, fields):
+    """Which of ``fields`` this save actually changes, respecting ``update_fields``"""
+    fields = {instance._meta.get_field(name).attname for name in fields}
+    if update_fields is not None:
+        fields &= {instance._meta.get_field(name).attname for name in update_fields}
+    return instance.get_dirty_fields(fields)
+
+
+@receiver(pre_save, sender=Student)
+def create_student_user_account(sender, instance, **kwargs):
     """
-    Create a user account for the student when a new student is created
+    Create a user account for a new student before it is inserted, so the
+    INSERT already carries ``user_id``
     """
-    if created and not instance.user and instance.email:
+    if instance._state.adding and instance.user_id is None and instance.email:
         # Create user account for student
-        user = User.objects.create_user(
+        instance.user = User.objects.create_user(
             email=instance.email,
             first_name=instance.first_name,
             last_name=instance.last_name,
             user_type='STUDENT',
             is_active=True
         )
-        instance.user = user
-        instance.save(update_fields=['user'])
 
 
 @receiver(post_save, sender=Student)
-def update_student_user_info(sender, instance, created, **kwargs):
+def update_student_user_info(sender, instance, created, update_fields=None, **kwargs):
     """
-    Update user information when student information is updated
+    Update user information when the mirrored student fields change
     """
-    if not created and instance.user:
-        user = instance.user
-        user.first_name = instance.first_name
-        user.last_name = instance.last_name
-        user.email = instance.email or user.email
-        user.is_active = instance.is_active()
-        user.save(update_fields=['first_name', 'last_name', 'email', 'is_active'])
+    if created or instance.user_id is None:
+        return
+    if not saved_changes(instance, update_fields, USER_SYNC_FIELDS):
+        return
+    user = instance.user
+    user.first_name = instance.first_name
+    user.last_name = instance.last_name
+    user.email = instance.email or user.email
+    user.is_active = instance.is_active()
+    changed = user.get_dirty_fields(['first_name', 'last_name', 'email', 'is_active'])
+    if changed:
+        user.save(update_fields=changed)
 
 
 @receiver(pre_delete, sender=Student)
@@ -44,6 +66,99 @@ def handle_student_deletion(sender, instance, **kwargs):
     Handle cleanup when a student is deleted
     """
     # Optionally deactivate the user account instead of deleting
-    if instance.user:
+    if instance.user_id is not None and instance.user.is_active:
         instance.user.is_active = False
         instance.user.save(update_fields=['is_active'])
+
+
+@receiver(post_save, sender=Student)
+def update_autocomplete_index(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Apply the saved student to the autocomplete index once the transaction commits
+    """
+    if not created and not saved_changes(instance, update_fields, autocomplete.VALUE_FIELDS):
+        return
+    row = {field: getattr(instance, field) for field in autocomplete.VALUE_FIELDS}
+    transaction.on_commit(lambda: autocomplete.index.upsert(row))
+
+
+@receiver(post_delete, sender=Student)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    """
+    Drop a deleted student from the autocomplete index once the transaction commits
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove(pk))
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_results(sender, instance, created=None, update_fields=None, **kwargs):
+    """
+    Expire cached list/search results once the transaction commits
+    """
+    if created is False:
+        fields = [
+            field.attname for field in Student._meta.concrete_fields
+            if field.attname not in RESULT_IRRELEVANT_FIELDS
+        ]
+        if not saved_changes(instance, update_fields, fields):
+            return
+    transaction.on_commit(result_cache.invalidate)
+
+
+def writes_counted_fields(update_fields):
+    """
+    Whether a save can overwrite counted fields. A full ``save()`` can even
+    when the instance has no dirty ones: a stale instance writes back values
+    another transaction has since changed.
+    """
+    if update_fields is None:
+        return True
+    return not {Student._meta.get_field(name).attname for name in update_fields}.isdisjoint(
+        Student._meta.get_field(name).attname for name in counters.COUNTED_FIELDS
+    )
+
+
+@receiver(pre_save, sender=Student)
+def remember_counted_fields(sender, instance, update_fields=None, **kwargs):
+    """
+    Lock the stored row and remember the values the enrollment counters saw
+    """
+    instance._counted_before = None
+    if instance._state.adding or not writes_counted_fields(update_fields):
+        return
+    instance._counted_before = (
+        Student.objects.select_for_update()
+        .filter(pk=instance.pk).values(*counters.COUNTED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Student)
+def update_enrollment_counters(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Move the student between enrollment counters inside the saving transaction
+    """
+    before = None if created else instance._counted_before
+    if not created and before is None:
+        return
+    StudentCounter.apply(counters.delta(before, counters.snapshot(instance)))
+
+
+@receiver(post_delete, sender=Student)
+def remove_from_enrollment_counters(sender, instance, **kwargs):
+    """
+    Take a deleted student out of the enrollment counters
+    """
+    StudentCounter.apply(counters.delta(before=counters.snapshot(instance)))
+
+
+@receiver(post_save, sender=StudentDocument)
+@receiver(post_delete, sender=StudentDocument)
+@receiver(post_save, sender=StudentNote)
+@receiver(post_delete, sender=StudentNote)
+def touch_student(sender, instance, **kwargs):
+    """
+    Bump the student's updated_at so detail ETags cover documents and notes
+    """
+    Student.objects.filter(pk=instance.student_id).update(updated_at=timezone.now())
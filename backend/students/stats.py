@@ -0,0 +1,107 @@
+"""
+Aggregate statistics for the student dashboard.
+
+All figures are produced by a single grouped aggregate query so the cost of
+``student_stats`` no longer depends on loading every ``Student`` row into
+Python.
+"""
+from collections import Counter
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Student
+
+
+# Age bands reported by the dashboard as (label, min_age, max_age).
+AGE_BANDS = [
+    ('3-5', 3, 5),
+    ('6-8', 6, 8),
+    ('9-11', 9, 11),
+    ('12-14', 12, 14),
+    ('15-17', 15, 17),
+]
+
+# Everything outside the bands above (including under-3s) has always been
+# reported under this label.
+OVERFLOW_BAND = '18+'
+
+
+def years_before(day, years):
+    """Return the same calendar day ``years`` earlier (29 Feb maps to 28 Feb)"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_band_filter(min_age, max_age, today=None):
+    """
+    Build a ``date_of_birth`` range filter matching ``Student.get_age()``
+    values between ``min_age`` and ``max_age`` inclusive.
+    """
+    today = today or timezone.localdate()
+    return Q(
+        date_of_birth__lte=years_before(today, min_age),
+        date_of_birth__gt=years_before(today, max_age + 1),
+    )
+
+
+def compute_student_stats(queryset=None, today=None):
+    """
+    Compute the data for ``StudentStatsSerializer`` in one SQL statement.
+
+    Rows are grouped by class, status and gender, with conditional counts for
+    active students, this month's admissions and each age band.  Python only
+    folds the grouped rows, so memory use is bounded by the number of distinct
+    groups rather than the number of students.
+    """
+    if queryset is None:
+        queryset = Student.objects.all()
+    today = today or timezone.localdate()
+    month_start = today.replace(day=1)
+
+    band_annotations = {
+        f'band_{index}': Count('id', filter=age_band_filter(low, high, today))
+        for index, (_, low, high) in enumerate(AGE_BANDS)
+    }
+    groups = (
+        queryset.order_by()
+        .values('current_class', 'status', 'gender')
+        .annotate(
+            count=Count('id'),
+            active=Count('id', filter=Q(status='active', enrollment_status=True)),
+            new_admissions=Count('id', filter=Q(admission_date__gte=month_start)),
+            **band_annotations
+        )
+    )
+
+    total = active = new_admissions = 0
+    by_class, by_status, by_gender, bands = Counter(), Counter(), Counter(), Counter()
+    for group in groups:
+        count = group['count']
+        total += count
+        active += group['active']
+        new_admissions += group['new_admissions']
+        by_class[group['current_class']] += count
+        by_status[group['status']] += count
+        by_gender[group['gender']] += count
+        for index in range(len(AGE_BANDS)):
+            bands[index] += group[f'band_{index}']
+
+    age_distribution = {
+        label: bands[index] for index, (label, _, _) in enumerate(AGE_BANDS)
+    }
+    age_distribution[OVERFLOW_BAND] = total - sum(age_distribution.values())
+
+    return {
+        'total_students': total,
+        'active_students': active,
+        'inactive_students': by_status.get('inactive', 0),
+        'graduated_students': by_status.get('graduated', 0),
+        'new_admissions_this_month': new_admissions,
+        'students_by_class': dict(by_class),
+        'students_by_status': dict(by_status),
+        'gender_distribution': dict(by_gender),
+        'age_distribution': age_distribution,
+    }
@@ -0,0 +1,166 @@
+"""
+Set-based bulk status transitions.
+
+``StatusTransition`` moves many students to a new status in one transaction
+without saving them one by one: each chunk of ids is locked and classified
+with one query, updated with one ``UPDATE`` (which also keeps the enrollment
+counters in step) and has its linked users' ``is_active`` flag synced with
+one more ``UPDATE`` (and their cached copies expired), mirroring what ``update_student_user_info`` does for a
+single save. A student already in the target status is still updated when
+another field of ``status_changes()`` differs, such as an active student who
+is not enrolled. Every requested id gets one outcome in the report.
+"""
+import uuid
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import user_cache
+
+from . import autocomplete, counters, result_cache
+from .models import Student
+
+User = get_user_model()
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Current status -> statuses it may move to. Leavers can only be re-admitted.
+ALLOWED_TRANSITIONS = {
+    'active': {'inactive', 'suspended', 'graduated', 'transferred', 'expelled'},
+    'inactive': {'active', 'suspended', 'graduated', 'transferred', 'expelled'},
+    'suspended': {'active', 'inactive', 'transferred', 'expelled'},
+    'graduated': {'active'},
+    'transferred': {'active'},
+    'expelled': {'active'},
+}
+
+# Outcomes reported per id
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_ALLOWED = 'not_allowed'
+NOT_FOUND = 'not_found'
+INVALID_ID = 'invalid_id'
+
+
+class InvalidTransition(ValueError):
+    """Raised for an unknown target status"""
+
+
+def status_changes(new_status, today=None):
+    """Fields written alongside ``status`` for each target status"""
+    changes = {'status': new_status}
+    if new_status == 'active':
+        changes['enrollment_status'] = True
+    elif new_status == 'inactive':
+        changes['enrollment_status'] = False
+    elif new_status == 'graduated':
+        changes['graduation_date'] = today or timezone.localdate()
+    return changes
+
+
+def parse_id(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class StatusTransition:
+    """Move students to ``new_status`` in bulk, see the module docstring"""
+
+    def __init__(self, new_status, updated_by=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if new_status not in dict(Student.STATUS_CHOICES):
+            raise InvalidTransition(f'Invalid status: {new_status}')
+        self.new_status = new_status
+        self.updated_by = updated_by
+        self.chunk_size = chunk_size
+        self.changes = status_changes(new_status)
+        # Student.is_active() drives the linked user's flag; moving to 'active'
+        # always re-enrolls, every other status is inactive
+        self.user_is_active = new_status == 'active'
+
+    def run(self, student_ids):
+        """Apply the transition and return ``{'status', 'summary', 'results'}``"""
+        results = []
+        ids = iter(self.unique(student_ids))
+        with transaction.atomic():
+            while True:
+                chunk = list(islice(ids, self.chunk_size))
+                if not chunk:
+                    break
+                results.extend(self.process_chunk(chunk))
+            updated = [parse_id(result['id']) for result in results if result['outcome'] == UPDATED]
+            if updated:
+                # Queryset updates skip the signals that keep these current
+                transaction.on_commit(lambda: autocomplete.mark_changed(updated))
+                transaction.on_commit(result_cache.invalidate)
+
+        return {
+            'status': self.new_status,
+            'summary': dict(Counter(result['outcome'] for result in results)),
+            'results': results,
+        }
+
+    def run_queryset(self, queryset):
+        return self.run(list(queryset.order_by().values_list('pk', flat=True)))
+
+    def unique(self, student_ids):
+        """``student_ids`` without repeats of an id, in any spelling"""
+        seen = set()
+        for raw in student_ids:
+            key = parse_id(raw) or str(raw)
+            if key not in seen:
+                seen.add(key)
+                yield raw
+
+    def pending_changes(self, row):
+        """The fields of ``self.changes`` that ``row`` does not have yet"""
+        pending = {field: value for field, value in self.changes.items() if row[field] != value}
+        if row['status'] == self.new_status and row.get('graduation_date') is not None:
+            # Already graduated: keep the recorded date
+            pending.pop('graduation_date', None)
+        return pending
+
+    def process_chunk(self, chunk):
+        parsed = [(raw, parse_id(raw)) for raw in chunk]
+        fields = {'pk', 'user_id', *counters.COUNTED_FIELDS, *self.changes}
+        current = {
+            row['pk']: row for row in
+            Student.objects.select_for_update()
+            .filter(pk__in=[pk for _, pk in parsed if pk is not None])
+            .values(*fields)
+        }
+
+        results, allowed = [], []
+        for raw, pk in parsed:
+            row = current.get(pk)
+            previous = row['status'] if row is not None else None
+            if pk is None:
+                outcome = INVALID_ID
+            elif row is None:
+                outcome = NOT_FOUND
+            elif not self.pending_changes(row):
+                outcome = UNCHANGED
+            elif previous != self.new_status and self.new_status not in ALLOWED_TRANSITIONS.get(previous, ()):
+                outcome = NOT_ALLOWED
+            else:
+                outcome = UPDATED
+                allowed.append(row)
+            results.append({'id': str(raw), 'outcome': outcome, 'previous_status': previous})
+
+        if allowed:
+            changes = {**self.changes, 'updated_at': timezone.now()}
+            if self.updated_by is not None:
+                changes['updated_by'] = self.updated_by
+            counters.counted_update(
+                Student.objects.filter(pk__in=[row['pk'] for row in allowed]), previous=allowed, **changes
+            )
+            user_ids = [row['user_id'] for row in allowed if row['user_id'] is not None]
+            if user_ids:
+                User.objects.filter(pk__in=user_ids).update(is_active=self.user_is_active)
+                # Queryset updates skip the signal that expires cached users
+                user_cache.bump_on_commit(*user_ids)
+        return results
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the hot read endpoints are served by native async views
+if getattr(settings, 'STUDENT_ASYNC_READ_VIEWS', False):
+    from . import async_views as read_views
+else:
+    read_views = views
+
 app_name = 'students'
 
 urlpatterns = [
@@ -9,19 +16,26 @@ urlpatterns = [
     path('<uuid:id>/', views.StudentDetailView.as_view(), name='student-detail'),
     
     # Student statistics and analytics
-    path('stats/', views.student_stats, name='student-stats'),
+    path('stats/', read_views.student_stats, name='student-stats'),
     path('search/', views.student_search, name='student-search'),
-    path('recent-admissions/', views.recent_admissions, name='recent-admissions'),
+    path('recent-admissions/', read_views.recent_admissions, name='recent-admissions'),
     
     # Students by filters
-    path('status/<str:status_type>/', views.students_by_status, name='students-by-status'),
-    path('class/<str:class_name>/', views.students_by_class, name='students-by-class'),
+    path('status/<str:status_type>/', read_views.students_by_status, name='students-by-status'),
+    path('class/<str:class_name>/', read_views.students_by_class, name='students-by-class'),
     
     # Bulk operations
     path('bulk/update-status/', views.bulk_update_status, name='bulk-update-status'),
+    path('bulk/import/', views.student_import, name='student-import'),
+    
+    # Exports
+    path('export/', views.StudentExportView.as_view(), name='student-export'),
     
     # Quick info
-    path('quick-info/<str:student_id>/', views.student_quick_info, name='student-quick-info'),
+    path('quick-info/<str:student_id>/', read_views.student_quick_info, name='student-quick-info'),
+    path('autocomplete/', views.student_autocomplete, name='student-autocomplete'),
+    path('autocomplete/metrics/', views.student_autocomplete_metrics, name='student-autocomplete-metrics'),
+    path('cache/metrics/', views.student_result_cache_metrics, name='student-result-cache-metrics'),
     
     # Student documents
     path('<uuid:student_id>/documents/', views.StudentDocumentListCreateView.as_view(), name='student-documents'),
@@ -1,45 +1,149 @@
 from rest_framework import generics, status, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, throttle_classes
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
+from django.http import StreamingHttpResponse
+from django.db.models import Prefetch
 from django.utils import timezone
+from core import metrics
+from core.throttling import UserRateThrottle, SearchRateThrottle, BulkRateThrottle
 from datetime import datetime, timedelta
+from functools import partial
 from .models import Student, StudentDocument, StudentNote
 from .serializers import (
     StudentListSerializer, StudentDetailSerializer, StudentCreateSerializer,
     StudentUpdateSerializer, StudentStatsSerializer, StudentSearchSerializer,
-    StudentDocumentSerializer, StudentNoteSerializer
+    StudentDocumentSerializer, StudentNoteSerializer, get_sparse_fieldset
+)
+from .pagination import StudentPagination, StudentKeysetPagination
+from .search import StudentSearchFilter, search_students
+from . import autocomplete, conditional, counters, result_cache
+from .rows import StudentListEncoder
+from .importer import StudentImporter, ImportFormatError, iter_rows
+from .transitions import StatusTransition, InvalidTransition, UPDATED
+from .exporter import (
+    EXPORT_CHUNK_SIZE, EXPORT_FORMATS, parse_export_columns, stream_export
 )
 
 
-class StudentPagination(PageNumberPagination):
-    """Custom pagination for students"""
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class StudentFilterMixin:
+    """Filtering, search and ordering shared by the student list and export views"""
+    filter_backends = [DjangoFilterBackend, StudentSearchFilter, filters.OrderingFilter]
+    filterset_fields = ['status', 'current_class', 'section', 'gender', 'enrollment_status']
+    search_fields = ['first_name', 'last_name', 'student_id', 'email', 'phone_number']
+    ordering_fields = ['first_name', 'last_name', 'student_id', 'admission_date', 'created_at']
+    ordering = ['first_name', 'last_name']
 
 
-class StudentListCreateView(generics.ListCreateAPIView):
+def only_listed_columns(queryset, fieldset=None):
+    """
+    Load only the columns StudentListSerializer will emit for ``fieldset``.
+    
+    The keyset columns are always loaded so cursor links can be built
+    without touching deferred fields.
+    """
+    serializer = StudentListSerializer(context={'sparse_fieldset': fieldset or {}})
+    query_columns = serializer.get_query_columns()
+    if query_columns is None:
+        return queryset
+    columns, related = query_columns
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns, *StudentKeysetPagination.keyset)
+
+
+def class_roster(class_name):
+    return Student.objects.filter(current_class__iexact=class_name)
+
+
+def admitted_since(moment):
+    return Student.objects.filter(admission_date__gte=moment)
+
+
+def list_encoder(queryset, fieldset, url_request=None):
+    """
+    The queryset to read and the function encoding its rows for ``fieldset``.
+    
+    Rows are read with ``values_list`` and encoded by ``StudentListEncoder``;
+    the serializer is only used when the fieldset asks for a field the
+    encoder does not know.
+    """
+    encoder = StudentListEncoder(fieldset, request=url_request)
+    if encoder.supported:
+        def encode(rows):
+            with metrics.timed('serialize'):
+                return encoder.encode(rows)
+        return encoder.queryset(queryset), encode
+    
+    queryset = only_listed_columns(queryset, fieldset)
+    context = {'sparse_fieldset': fieldset}
+    if url_request is not None:
+        context['request'] = url_request
+    
+    def encode(rows):
+        # Timed by the serializer (TimedSerializerMixin)
+        return StudentListSerializer(rows, many=True, context=context).data
+    return queryset, encode
+
+
+def quick_info_data(student):
+    return {
+        'id': student.id,
+        'student_id': student.student_id,
+        'full_name': student.get_full_name(),
+        'current_class': student.current_class,
+        'section': student.section,
+        'status': student.status,
+        'phone_number': student.phone_number,
+        'email': student.email,
+        'emergency_contact': student.get_primary_contact(),
+        'profile_picture': student.profile_picture.url if student.profile_picture else None
+    }
+
+
+def student_list_response(request, queryset, fieldset, paginator=None, view=None, absolute_urls=False):
+    """
+    Serialize (and paginate) a student list with ``list_encoder()``.
+    ``absolute_urls`` mirrors passing the request in the serializer context.
+    """
+    queryset, encode = list_encoder(queryset, fieldset, request if absolute_urls else None)
+    if paginator is not None:
+        rows = paginator.paginate_queryset(queryset, request, view=view)
+        if rows is not None:
+            return paginator.get_paginated_response(encode(rows))
+    return Response(encode(list(queryset)))
+
+
+class StudentListCreateView(StudentFilterMixin, generics.ListCreateAPIView):
     """
     List all students or create a new student
+    
+    GET accepts ``?fields=`` / ``?exclude=`` to narrow both the response and
+    the columns read from the database.
     """
     queryset = Student.objects.all()
     permission_classes = [IsAuthenticated]
     pagination_class = StudentPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'current_class', 'section', 'gender', 'enrollment_status']
-    search_fields = ['first_name', 'last_name', 'student_id', 'email', 'phone_number']
-    ordering_fields = ['first_name', 'last_name', 'student_id', 'admission_date', 'created_at']
-    ordering = ['first_name', 'last_name']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return StudentCreateSerializer
         return StudentListSerializer
     
+    def list(self, request, *args, **kwargs):
+        def build():
+            queryset = self.filter_queryset(self.get_queryset())
+            return student_list_response(
+                request, queryset, get_sparse_fieldset(request),
+                paginator=self.paginator, view=self, absolute_urls=True
+            )
+        etag = conditional.results_etag(request, 'list', self.filter_queryset(self.get_queryset()))
+        return conditional.conditional_response(
+            request, etag, lambda: result_cache.cached_response('list', request, build)
+        )
+    
     def perform_create(self, serializer):
         # Handle anonymous users when authentication is disabled
         if self.request.user.is_authenticated:
@@ -48,6 +152,41 @@ class StudentListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
+class StudentExportView(StudentFilterMixin, generics.GenericAPIView):
+    """
+    Stream the filtered student list as CSV or NDJSON
+    
+    Accepts the same filter, search and ordering parameters as the list view,
+    plus ``export_format`` (csv or ndjson) and a comma separated ``columns``.
+    """
+    queryset = Student.objects.all()
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Invalid export_format. Valid options: {list(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            columns = parse_export_columns(request.query_params.get('columns'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        content_type, extension = EXPORT_FORMATS[export_format]
+        
+        response = StreamingHttpResponse(
+            stream_export(rows, columns, export_format), content_type=content_type
+        )
+        filename = f"students-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a student
@@ -56,11 +195,36 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        # Everything StudentDetailSerializer touches, in a fixed number of queries
+        return queryset.select_related(
+            'user', 'created_by', 'updated_by'
+        ).prefetch_related(
+            Prefetch('documents', queryset=StudentDocument.objects.select_related('uploaded_by')),
+            Prefetch('student_notes', queryset=StudentNote.objects.select_related('created_by')),
+        )
+    
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return StudentUpdateSerializer
         return StudentDetailSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        # Validators come from updated_at alone, which document and note
+        # changes also bump, so nothing related is loaded for a 304
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        updated_at = Student.objects.filter(**lookup).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = conditional.make_etag(request, lookup[self.lookup_field], updated_at.isoformat())
+        return conditional.conditional_response(
+            request, etag, partial(super().retrieve, request, *args, **kwargs),
+            last_modified=updated_at
+        )
+    
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
 
@@ -71,72 +235,7 @@ def student_stats(request):
     """
     Get comprehensive student statistics
     """
-    # Basic counts
-    total_students = Student.objects.count()
-    active_students = Student.objects.filter(status='active', enrollment_status=True).count()
-    inactive_students = Student.objects.filter(status='inactive').count()
-    graduated_students = Student.objects.filter(status='graduated').count()
-    
-    # New admissions this month
-    current_month = timezone.now().replace(day=1)
-    new_admissions_this_month = Student.objects.filter(
-        admission_date__gte=current_month
-    ).count()
-    
-    # Students by class
-    students_by_class = dict(
-        Student.objects.values('current_class')
-        .annotate(count=Count('id'))
-        .values_list('current_class', 'count')
-    )
-    
-    # Students by status
-    students_by_status = dict(
-        Student.objects.values('status')
-        .annotate(count=Count('id'))
-        .values_list('status', 'count')
-    )
-    
-    # Gender distribution
-    gender_distribution = dict(
-        Student.objects.values('gender')
-        .annotate(count=Count('id'))
-        .values_list('gender', 'count')
-    )
-    
-    # Age distribution
-    from datetime import date
-    current_date = date.today()
-    age_ranges = {
-        '3-5': 0, '6-8': 0, '9-11': 0, '12-14': 0, '15-17': 0, '18+': 0
-    }
-    
-    for student in Student.objects.all():
-        age = student.get_age()
-        if 3 <= age <= 5:
-            age_ranges['3-5'] += 1
-        elif 6 <= age <= 8:
-            age_ranges['6-8'] += 1
-        elif 9 <= age <= 11:
-            age_ranges['9-11'] += 1
-        elif 12 <= age <= 14:
-            age_ranges['12-14'] += 1
-        elif 15 <= age <= 17:
-            age_ranges['15-17'] += 1
-        else:
-            age_ranges['18+'] += 1
-    
-    stats_data = {
-        'total_students': total_students,
-        'active_students': active_students,
-        'inactive_students': inactive_students,
-        'graduated_students': graduated_students,
-        'new_admissions_this_month': new_admissions_this_month,
-        'students_by_class': students_by_class,
-        'students_by_status': students_by_status,
-        'gender_distribution': gender_distribution,
-        'age_distribution': age_ranges,
-    }
+    stats_data = counters.read_stats()
     
     serializer = StudentStatsSerializer(stats_data)
     return Response(serializer.data)
@@ -144,6 +243,8 @@ def student_stats(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([UserRateThrottle, SearchRateThrottle])
+@result_cache.cache_results('search')
 def student_search(request):
     """
     Advanced student search with multiple filters
@@ -153,19 +254,13 @@ def student_search(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     data = serializer.validated_data
+    fieldset = get_sparse_fieldset(request)
     queryset = Student.objects.all()
     
-    # Text search
+    # Text search, ranked by relevance unless an explicit ordering is requested
+    rank_results = bool(data.get('query')) and 'ordering' not in request.data
     if data.get('query'):
-        query = data['query']
-        queryset = queryset.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(middle_name__icontains=query) |
-            Q(student_id__icontains=query) |
-            Q(email__icontains=query) |
-            Q(phone_number__icontains=query)
-        )
+        queryset = search_students(queryset, data['query'], rank=rank_results)
     
     # Status filter
     if data.get('status'):
@@ -204,25 +299,18 @@ def student_search(request):
             queryset = queryset.filter(date_of_birth__year__gte=min_birth_year)
     
     # Ordering
-    ordering = data.get('ordering', 'first_name')
-    if ordering.startswith('-'):
-        queryset = queryset.order_by(ordering)
-    else:
+    if not rank_results:
+        ordering = data.get('ordering', 'first_name')
         queryset = queryset.order_by(ordering)
     
     # Paginate results
-    paginator = StudentPagination()
-    page = paginator.paginate_queryset(queryset, request)
-    if page is not None:
-        serializer = StudentListSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
-    
-    serializer = StudentListSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return student_list_response(request, queryset, fieldset, paginator=StudentPagination())
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional.conditional_collection(lambda status_type: Student.objects.filter(status=status_type), namespace='by_status')
+@result_cache.cache_results('by_status')
 def students_by_status(request, status_type):
     """
     Get students filtered by specific status
@@ -235,37 +323,27 @@ def students_by_status(request, status_type):
         )
     
     students = Student.objects.filter(status=status_type)
-    paginator = StudentPagination()
-    page = paginator.paginate_queryset(students, request)
-    
-    if page is not None:
-        serializer = StudentListSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
-    
-    serializer = StudentListSerializer(students, many=True)
-    return Response(serializer.data)
+    return student_list_response(
+        request, students, get_sparse_fieldset(request), paginator=StudentPagination()
+    )
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional.conditional_collection(class_roster, namespace='by_class')
+@result_cache.cache_results('by_class')
 def students_by_class(request, class_name):
     """
     Get students in a specific class
     """
-    students = Student.objects.filter(current_class__iexact=class_name)
-    paginator = StudentPagination()
-    page = paginator.paginate_queryset(students, request)
-    
-    if page is not None:
-        serializer = StudentListSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
-    
-    serializer = StudentListSerializer(students, many=True)
-    return Response(serializer.data)
+    return student_list_response(
+        request, class_roster(class_name), get_sparse_fieldset(request), paginator=StudentPagination()
+    )
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([UserRateThrottle, BulkRateThrottle])
 def bulk_update_status(request):
     """
     Bulk update student status
@@ -279,26 +357,65 @@ def bulk_update_status(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    if new_status not in dict(Student.STATUS_CHOICES).keys():
+    if not isinstance(student_ids, list):
+        return Response(
+            {'error': 'student_ids must be a list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        transition = StatusTransition(new_status, updated_by=request.user)
+    except InvalidTransition:
         return Response(
             {'error': 'Invalid status'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    updated_count = Student.objects.filter(
-        id__in=student_ids
-    ).update(
-        status=new_status,
-        updated_by=request.user,
-        updated_at=timezone.now()
-    )
+    report = transition.run(student_ids)
+    updated_count = report['summary'].get(UPDATED, 0)
     
     return Response({
         'message': f'Successfully updated {updated_count} students',
-        'updated_count': updated_count
+        'updated_count': updated_count,
+        **report,
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([UserRateThrottle, BulkRateThrottle])
+@parser_classes([MultiPartParser, FormParser])
+def student_import(request):
+    """
+    Bulk import students from an uploaded CSV or XLSX file
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response(
+            {'error': 'file is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    importer = StudentImporter(
+        created_by=request.user if request.user.is_authenticated else None,
+        dry_run=dry_run
+    )
+    try:
+        report = importer.run(iter_rows(upload, upload.name))
+    except ImportFormatError as exc:
+        # Batches before the unreadable part are already imported
+        return Response(
+            {'error': str(exc), **importer.report, 'dry_run': dry_run},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    report['dry_run'] = dry_run
+    if report['created'] and not dry_run:
+        return Response(report, status=status.HTTP_201_CREATED)
+    return Response(report)
+
+
 # Student Documents Views
 class StudentDocumentListCreateView(generics.ListCreateAPIView):
     """
@@ -309,7 +426,7 @@ class StudentDocumentListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         student_id = self.kwargs['student_id']
-        return StudentDocument.objects.filter(student_id=student_id)
+        return StudentDocument.objects.filter(student_id=student_id).select_related('uploaded_by')
     
     def perform_create(self, serializer):
         student_id = self.kwargs['student_id']
@@ -328,7 +445,7 @@ class StudentDocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         student_id = self.kwargs['student_id']
-        return StudentDocument.objects.filter(student_id=student_id)
+        return StudentDocument.objects.filter(student_id=student_id).select_related('uploaded_by')
 
 
 # Student Notes Views
@@ -341,7 +458,7 @@ class StudentNoteListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         student_id = self.kwargs['student_id']
-        return StudentNote.objects.filter(student_id=student_id)
+        return StudentNote.objects.filter(student_id=student_id).select_related('created_by')
     
     def perform_create(self, serializer):
         student_id = self.kwargs['student_id']
@@ -360,22 +477,20 @@ class StudentNoteDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         student_id = self.kwargs['student_id']
-        return StudentNote.objects.filter(student_id=student_id)
+        return StudentNote.objects.filter(student_id=student_id).select_related('created_by')
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional.conditional_collection(lambda: admitted_since(timezone.now() - timedelta(days=30)))
 def recent_admissions(request):
     """
     Get recently admitted students (last 30 days)
     """
     thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_students = Student.objects.filter(
-        admission_date__gte=thirty_days_ago
-    ).order_by('-admission_date')
+    recent_students = admitted_since(thirty_days_ago).order_by('-admission_date')
     
-    serializer = StudentListSerializer(recent_students, many=True)
-    return Response(serializer.data)
+    return student_list_response(request, recent_students, get_sparse_fieldset(request))
 
 
 @api_view(['GET'])
@@ -386,21 +501,44 @@ def student_quick_info(request, student_id):
     """
     try:
         student = Student.objects.get(student_id=student_id)
-        data = {
-            'id': student.id,
-            'student_id': student.student_id,
-            'full_name': student.get_full_name(),
-            'current_class': student.current_class,
-            'section': student.section,
-            'status': student.status,
-            'phone_number': student.phone_number,
-            'email': student.email,
-            'emergency_contact': student.get_primary_contact(),
-            'profile_picture': student.profile_picture.url if student.profile_picture else None
-        }
-        return Response(data)
+        return Response(quick_info_data(student))
     except Student.DoesNotExist:
         return Response(
             {'error': 'Student not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([UserRateThrottle, SearchRateThrottle])
+def student_autocomplete(request):
+    """
+    Typeahead suggestions for the student picker, served from an in-memory prefix index
+    """
+    try:
+        limit = int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT))
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+    limit = max(1, min(limit, autocomplete.MAX_LIMIT))
+    
+    results = autocomplete.index.search(request.query_params.get('q', ''), limit=limit)
+    return Response({'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def student_autocomplete_metrics(request):
+    """
+    Size, memory usage and rebuild timings of this process's autocomplete index
+    """
+    return Response(autocomplete.index.metrics())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def student_result_cache_metrics(request):
+    """
+    Hit/miss counts and ratios of this process's student result cache
+    """
+    return Response(result_cache.metrics())